@@ -7,192 +7,424 @@ Sora GUI自動操作 - CLI インターフェース (イベント駆動版)
 複数の出力モード対応: json/ndjson/verbose/interactive/quiet
 """
 
-import argparse
 import json
+import os
+import queue
+import stat
 import sys
 import threading
 import signal
 from pathlib import Path
+from types import SimpleNamespace
 
 from .chatgpt_core import iter_process_prompts, InputError, RunError
 from .config import create_config
 from .logging_setup import setup_chatgpt_logger, get_null_logger
 
+try:
+    import orjson  # 任意依存: NDJSON/JSON出力の高速化
+except ImportError:
+    orjson = None
+
+
+def _std_dumps(obj) -> bytes:
+    """標準 json でUTF-8バイト列にシリアライズ（サロゲート文字はエスケープして出力）"""
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8", "backslashreplace")
+
+
+if orjson is not None:
+    def _dumps(obj) -> bytes:
+        """orjson でUTF-8バイト列にシリアライズ"""
+        try:
+            return orjson.dumps(obj)
+        except orjson.JSONEncodeError:
+            # サロゲート文字・64bit超の整数など orjson が扱えない値
+            return _std_dumps(obj)
+else:
+    _dumps = _std_dumps
+
+
+# NDJSON で頻出する固定スキーマのイベント: (type, ((キー, 値の種類), ...))
+#   int: 整数 / bool: 真偽値 / name: ASCII識別子（エスケープ不要な文字列）
+# 任意文字列（prompt, message 等）を含むイベントは対象外
+_NDJSON_SCHEMAS = (
+    ("phase", (("name", "name"),)),
+    ("progress", (("step", "name"), ("index", "int"), ("total", "int"))),
+    ("progress", (("step", "name"), ("index", "int"), ("total", "int"), ("x", "int"), ("y", "int"))),
+    ("progress", (("step", "name"), ("index", "int"), ("total", "int"), ("dry_run", "bool"))),
+    ("retry", (("attempt", "int"), ("max_retry", "int"), ("index", "int"), ("total", "int"))),
+    ("wait", (("seconds_left", "int"), ("minutes", "int"), ("seconds", "int"), ("next_index", "int"), ("total", "int"))),
+    ("wait", (("seconds_left", "int"), ("minutes", "int"), ("seconds", "int"), ("final", "bool"))),
+    ("result", (("total", "int"), ("sent", "int"), ("failed", "int")))
+)
+
+
+def _compile_event_encoder(event_type, fields):
+    """固定スキーマのイベント用に、テンプレートを埋め込んだエンコーダー関数を生成する
+
+    生成される関数はイベントを1行JSON（改行付きバイト列）にして返す。
+    値がスキーマに合わない場合は None を返すので、呼び出し側で汎用エンコーダーに回す
+    """
+    template = '{"type":"%s"' % event_type
+    loads = []
+    checks = [f"event['type'] == {event_type!r}"]
+    args = []
+    for i, (key, kind) in enumerate(fields):
+        var = f"v{i}"
+        loads.append(f"    {var} = event[{key!r}]\n")
+        if kind == "int":
+            template += f',"{key}":%d'
+            checks.append(f"type({var}) is int")
+            args.append(var)
+        elif kind == "bool":
+            template += f',"{key}":%s'
+            checks.append(f"({var} is True or {var} is False)")
+            args.append(f"(b'true' if {var} else b'false')")
+        else:
+            template += f',"{key}":"%s"'
+            checks.append(f"type({var}) is str and {var}.isascii() and {var}.isidentifier()")
+            args.append(f"{var}.encode()")
+    template = (template + "}\n").encode("ascii")
+    
+    source = (
+        "def encode(event):\n"
+        + "".join(loads)
+        + f"    if {' and '.join(checks)}:\n"
+        + f"        return {template!r} % ({', '.join(args)},)\n"
+        + "    return None\n"
+    )
+    namespace = {}
+    exec(source, namespace)
+    return namespace["encode"]
+
+
+if orjson is not None:
+    def _encode_event(event) -> bytes:
+        """イベントを1行JSON（改行付き）にする"""
+        return _dumps(event) + b"\n"
+else:
+    # 標準 json は遅いため、固定スキーマのイベントは生成したエンコーダーで処理する
+    # （orjson がある場合はそちらの方が速いので使わない）
+    _EVENT_ENCODERS = {
+        ("type",) + tuple(key for key, _ in fields): _compile_event_encoder(event_type, fields)
+        for event_type, fields in _NDJSON_SCHEMAS
+    }
+
+    def _encode_event(event) -> bytes:
+        """イベントを1行JSON（改行付き）にする"""
+        encode = _EVENT_ENCODERS.get(tuple(event))
+        if encode is not None:
+            line = encode(event)
+            if line is not None:
+                return line
+        return _std_dumps(event) + b"\n"
+
+
+def _open_stdout():
+    """stdout を 64KiB バッファ付きの UTF-8 テキストライターとして開く
+
+    print() のように1行ごとにロック取得・エンコード・flushを行わず、
+    書き出しは OutputHandler.flush() でまとめて行う。
+    fd を持たない stdout（テスト時の差し替え等）はそのまま使う。
+    """
+    try:
+        fd = sys.stdout.fileno()
+    except (AttributeError, OSError, ValueError):
+        return sys.stdout
+    sys.stdout.flush()
+    return open(fd, "w", encoding="utf-8", errors="backslashreplace",
+                buffering=65536, closefd=False)
+
+
+def _stdout_pipe_fd():
+    """stdout がパイプならその fd を返す（それ以外は None）
+
+    GUI/API連携でパイプに流す場合は os.write() で直接書き出し、
+    sys.stdout.buffer のロックとバッファリングを通さない。
+    """
+    try:
+        fd = sys.stdout.fileno()
+        if not stat.S_ISFIFO(os.fstat(fd).st_mode):
+            return None
+    except (AttributeError, OSError, ValueError):
+        return None
+    sys.stdout.flush()
+    return fd
+
 
 class OutputHandler:
     """出力モード別のハンドラー"""
+
+    # この件数ごとにバッファをflushする（それ以外は main() がイベント待ちの間にflushする）
+    _FLUSH_EVERY = 64
+
+    # 出力後すぐにflushするイベント
+    _FLUSH_NOW_EVENTS = frozenset(("error", "result"))
+
+    # バイト列を直接 stdout に書き出す出力モード
+    _BINARY_MODES = frozenset(("json", "ndjson"))
+
+    # 引数を持たない進捗ステップの表示メッセージ
+    _PROGRESS_STATIC = {
+        "activate": "🎯 ChatGPTウィンドウをアクティブ化",
+        "copy": "📋 クリップボードにコピー",
+        "paste": "📝 プロンプトを貼り付け",
+        "send": "🚀 プロンプトを送信"
+    }
+
+    # 見出しの区切り線
+    _BANNER = "=" * 50
+
+    # フェーズ名の表示用ラベル
+    _PHASE_NAMES = {
+        "initialization": "初期化",
+        "window_search": "ChatGPTウィンドウ検索",
+        "coordinate_setup": "座標設定",
+        "processing_prep": "処理準備",
+        "processing": "プロンプト送信",
+        "generation_wait": "生成完了待機",
+        "final_wait": "最終生成完了待機"
+    }
     
     def __init__(self, mode="verbose", interactive=False, quiet=False):
         self.mode = mode
         self.interactive = interactive
         self.quiet = quiet
         self.final_result = None
+        self._pending = 0
+        self._buf = bytearray()  # JSON出力用のバッファ（flush時に1回で書き出す）
+        
+        # JSON系はエンコード済みのバイト列をそのまま書くため、テキストレイヤーを通さない
+        if mode in self._BINARY_MODES:
+            self._out = None
+            self._raw_fd = _stdout_pipe_fd()
+            self._raw_out = getattr(sys.stdout, "buffer", None) if self._raw_fd is None else None
+            if self._raw_fd is None and self._raw_out is None:
+                # buffer を持たない stdout（StringIO 等への差し替え）にはテキストで書く
+                self._out = sys.stdout
+        else:
+            self._out = _open_stdout()
+            self._raw_fd = None
+            self._raw_out = None
+        
+        # イベント種別 -> 出力処理
+        self._verbose_dispatch = {
+            "phase": self._on_phase,
+            "loaded": self._on_loaded,
+            "window_found": self._on_window_found,
+            "countdown": self._on_countdown,
+            "coordinate": self._on_coordinate,
+            "progress": self._on_progress,
+            "done_logged": self._on_done_logged,
+            "wait": self._on_wait,
+            "error": self._on_error,
+            "result": self._on_result
+        }
+        self._quiet_dispatch = {
+            "loaded": self._on_quiet_loaded,
+            "result": self._on_quiet_result
+        }
+    
+    def _write(self, text):
+        """1行をバッファに書き込む"""
+        self._out.write(text)
+        self._out.write("\n")
+    
+    def _write_json(self, obj):
+        """オブジェクトを1行JSONとしてバッファに書き込む"""
+        buf = self._buf
+        buf += _dumps(obj)
+        buf += b"\n"
+    
+    def flush(self):
+        """バッファ済みの出力を書き出す"""
+        self._pending = 0
+        if self._raw_fd is not None:
+            if self._buf:
+                self._write_fd(self._buf)
+                self._buf.clear()
+        elif self._raw_out is not None:
+            if self._buf:
+                self._raw_out.write(self._buf)
+                self._buf.clear()
+            self._raw_out.flush()
+        else:
+            if self._buf:
+                self._out.write(self._buf.decode("utf-8"))
+                self._buf.clear()
+            self._out.flush()
+    
+    def _write_fd(self, data):
+        """パイプの fd に全バイトを書き出す（部分書き込みは残りを再送）"""
+        with memoryview(data) as view:
+            offset = 0
+            while offset < len(view):
+                offset += os.write(self._raw_fd, view[offset:])
+    
+    @property
+    def wants_all_events(self):
+        """全イベントが必要か（JSON モードは最終結果のみ使う）"""
+        return self.mode != "json"
     
     def handle_event(self, event):
         """イベントを適切な形式で出力"""
+        event_type = event.get("type")
+        
+        self._dispatch_event(event, event_type)
+        
+        self._pending += 1
+        if self._pending >= self._FLUSH_EVERY or event_type in self._FLUSH_NOW_EVENTS:
+            self.flush()
+    
+    def _dispatch_event(self, event, event_type):
+        """出力モード別の処理を呼び出す"""
         if self.mode == "json":
             # JSON モード: 最終結果のみ保存（出力は最後）
-            if event.get("type") == "result":
+            if event_type == "result":
                 self.final_result = event
         
         elif self.mode == "ndjson":
             # NDJSON モード: 全イベントを1行JSONで出力
-            try:
-                print(json.dumps(event, ensure_ascii=False))
-            except UnicodeEncodeError as e:
-                # 特殊文字が原因のエラーを検出
-                error_char = e.object[e.start:e.end] if hasattr(e, 'object') else '不明'
-                error_event = {
-                    "type": "error",
-                    "error_type": "UnicodeEncodeError",
-                    "message": f"特殊文字エラー: '{error_char}' (cp932でエンコードできない文字が含まれています)",
-                    "detail": f"CSVファイル内の特殊文字（{error_char}など）を通常のASCII文字に変更してください",
-                    "encoding": e.encoding if hasattr(e, 'encoding') else 'cp932'
-                }
-                print(json.dumps(error_event, ensure_ascii=True))
+            self._buf += _encode_event(event)
         
         elif self.mode == "verbose":
             # 詳細モード: 人向けのテキスト出力
-            self._handle_verbose(event)
+            self._handle_verbose(event, event_type)
         
         elif self.quiet:
             # 静音モード: 最小限の出力のみ
-            self._handle_quiet(event)
+            self._handle_quiet(event, event_type)
     
-    def _handle_verbose(self, event):
+    def _handle_verbose(self, event, event_type):
         """詳細モードの出力処理"""
-        event_type = event.get("type")
-        
-        if event_type == "phase":
-            phase_names = {
-                "initialization": "初期化",
-                "window_search": "ChatGPTウィンドウ検索", 
-                "coordinate_setup": "座標設定",
-                "processing_prep": "処理準備",
-                "processing": "プロンプト送信",
-                "generation_wait": "生成完了待機",
-                "final_wait": "最終生成完了待機"
-            }
-            phase_name = phase_names.get(event["name"], event["name"])
-            print(f"\n{'='*50}")
-            print(f"フェーズ: {phase_name}")
-            print(f"{'='*50}")
-        
-        elif event_type == "loaded":
-            print(f"プロンプト読み込み完了: {event['total']}個")
-            print(f"CSVファイル: {event['csv_path']}")
+        handler = self._verbose_dispatch.get(event_type)
+        if handler:
+            handler(event)
+    
+    def _on_phase(self, event):
+        """フェーズ開始"""
+        phase_name = self._PHASE_NAMES.get(event["name"], event["name"])
+        self._write(f"\n{self._BANNER}\nフェーズ: {phase_name}\n{self._BANNER}")
+    
+    def _on_loaded(self, event):
+        """プロンプト読み込み完了"""
+        self._write(f"プロンプト読み込み完了: {event['total']}個")
+        self._write(f"CSVファイル: {event['csv_path']}")
+    
+    def _on_window_found(self, event):
+        """ウィンドウ発見"""
+        self._write(f"ChatGPTウィンドウを発見: {event['title']}")
+    
+    def _on_countdown(self, event):
+        """カウントダウン"""
+        seconds_left = event["seconds_left"]
         
-        elif event_type == "window_found":
-            print(f"ChatGPTウィンドウを発見: {event['title']}")
+        if not self.interactive:
+            # 非インタラクティブモードでは最初の1回だけ簡潔に表示し、残りの秒は何もしない
+            if seconds_left == 5:
+                self._write(f"準備中... ({event.get('message', '')})")
+            return
         
-        elif event_type == "countdown":
-            if self.interactive:
-                phase = event.get("phase", "")
-                message = event.get("message", "")
-                if phase == "coordinate_setup":
-                    if event["seconds_left"] == 5:
-                        print("📍 ChatGPTの入力欄にマウスカーソルを置いてください")
-                        print("⏰ 5秒後に自動で座標を記録します")
-                        print("🚨 緊急停止: マウスを画面左上角に移動")
-                    print(f"⏳ {event['seconds_left']}秒...")
-                elif phase == "processing_prep":
-                    if event["seconds_left"] == 5:
-                        print("🚀 準備完了！")
-                        print(f"📊 処理対象: プロンプト")
-                        print("⏰ 5秒後に自動処理を開始します...")
-                        print("🚨 緊急停止: Ctrl+C または マウスを左上角に移動")
-                    print(f"⏳ {event['seconds_left']}秒...")
-            else:
-                # 非インタラクティブモードでは簡潔に
-                if event["seconds_left"] == 5:
-                    print(f"準備中... ({event.get('message', '')})")
+        phase = event.get("phase", "")
+        if phase == "coordinate_setup":
+            if seconds_left == 5:
+                self._write("📍 ChatGPTの入力欄にマウスカーソルを置いてください")
+                self._write("⏰ 5秒後に自動で座標を記録します")
+                self._write("🚨 緊急停止: マウスを画面左上角に移動")
+            self._write(f"⏳ {seconds_left}秒...")
+        elif phase == "processing_prep":
+            if seconds_left == 5:
+                self._write("🚀 準備完了！")
+                self._write(f"📊 処理対象: プロンプト")
+                self._write("⏰ 5秒後に自動処理を開始します...")
+                self._write("🚨 緊急停止: Ctrl+C または マウスを左上角に移動")
+            self._write(f"⏳ {seconds_left}秒...")
+    
+    def _on_coordinate(self, event):
+        """座標記録"""
+        self._write(f"✅ 座標記録完了: ({event['x']}, {event['y']})")
+        self._write("📝 この座標をChatGPTの入力欄として使用します")
+    
+    def _on_progress(self, event):
+        """プロンプト処理の進捗"""
+        step = event.get("step")
+        message = self._PROGRESS_STATIC.get(step)
+        if message:
+            self._write(message)
+            return
         
-        elif event_type == "coordinate":
-            print(f"✅ 座標記録完了: ({event['x']}, {event['y']})")
-            print("📝 この座標をChatGPTの入力欄として使用します")
+        index = event["index"]
+        total = event["total"]
+        prompt = event.get("prompt", "")
+        x = event.get("x")
+        y = event.get("y")
         
-        elif event_type == "progress":
-            step = event.get("step")
-            index = event["index"]
-            total = event["total"]
-            
-            if step == "start":
-                print(f"\n--- 📝 Processing prompt {index}/{total} ---")
-                try:
-                    print(f"📄 Prompt: {event.get('prompt', '')}")
-                except UnicodeEncodeError as e:
-                    error_char = e.object[e.start:e.end] if hasattr(e, 'object') else '不明'
-                    print(f"📄 Prompt: [特殊文字エラー: '{error_char}' が含まれています]")
-                    print(f"⚠️  CSVファイル内の特殊文字（{error_char}など）を通常のASCII文字に変更してください")
-            elif step == "activate":
-                print("🎯 ChatGPTウィンドウをアクティブ化")
-            elif step == "click":
-                print(f"🖱️ 入力エリアをクリック: ({event.get('x')}, {event.get('y')})")
-            elif step == "copy":
-                print("📋 クリップボードにコピー")
-            elif step == "paste":
-                print("📝 プロンプトを貼り付け")
-            elif step == "send":
-                print("🚀 プロンプトを送信")
+        if step == "start":
+            self._write(f"\n--- 📝 Processing prompt {index}/{total} ---")
+            self._write(f"📄 Prompt: {prompt}")
+        elif step == "click":
+            self._write(f"🖱️ 入力エリアをクリック: ({x}, {y})")
+    
+    def _on_done_logged(self, event):
+        """処理済みプロンプトの記録（CSVの done=1 は終了時にまとめて反映）"""
+        self._write(f"✅ 完了を記録しました (row {event.get('row')}): 終了時にCSVの done=1 に反映します")
+    
+    def _on_wait(self, event):
+        """生成完了待機"""
+        mins = event.get("minutes", 0)
+        secs = event.get("seconds", 0)
+        final = event.get("final")
+        next_idx = event.get("next_index", 0)
+        total = event.get("total", 0)
         
-        elif event_type == "csv_updated":
-            marked_done = event.get("marked_done", "")
-            if marked_done:
-                 print(f"✅ CSV更新: プロンプトを完了(done=1)にマークしました")
-            else:
-                # 後方互換性（念のため）
-                old_count = event.get("old_count", 0)
-                new_count = event.get("new_count", 0)
-                print(f"🗑️ 処理済みプロンプトを削除 ({old_count} → {new_count} rows)")
+        if final:
+            self._write(f"⏱️ 最終生成完了まで待機中: {mins:02d}:{secs:02d}")
+        else:
+            self._write(f"⏱️ 残り時間: {mins:02d}:{secs:02d} | 次: {next_idx}/{total}")
+    
+    def _on_error(self, event):
+        """プロンプト処理エラー"""
+        step = event.get("step", "unknown")
+        index = event.get("index", 0)
+        total = event.get("total", 0)
+        error_msg = event.get("error", "")
+        self._write(f"❌ エラー (step: {step}, {index}/{total}): {error_msg}")
+    
+    def _on_result(self, event):
+        """最終結果"""
+        total = event['total']
+        sent = event['sent']
+        failed = event['failed']
         
-        elif event_type == "wait":
-            mins = event.get("minutes", 0)
-            secs = event.get("seconds", 0)
-            
-            if event.get("final"):
-                print(f"⏱️ 最終生成完了まで待機中: {mins:02d}:{secs:02d}")
-            else:
-                next_idx = event.get("next_index", 0)
-                total = event.get("total", 0)
-                print(f"⏱️ 残り時間: {mins:02d}:{secs:02d} | 次: {next_idx}/{total}")
+        self._write(
+            f"\n{self._BANNER}\n🎉 処理完了!\n{self._BANNER}\n"
+            f"📊 処理対象: {total}個\n"
+            f"✅ 成功: {sent}個\n"
+            f"❌ 失敗: {failed}個"
+        )
         
-        elif event_type == "error":
-            step = event.get("step", "unknown")
-            index = event.get("index", 0)
-            total = event.get("total", 0)
-            error_msg = event.get("error", "")
-            try:
-                print(f"❌ エラー (step: {step}, {index}/{total}): {error_msg}")
-            except UnicodeEncodeError as e:
-                error_char = e.object[e.start:e.end] if hasattr(e, 'object') else '不明'
-                print(f"❌ エラー (step: {step}, {index}/{total}): [特殊文字エラー: '{error_char}' が含まれています]")
-                print(f"⚠️  CSVファイル内の特殊文字（{error_char}など）を通常のASCII文字に変更してください")
+        if total > 0:
+            success_rate = (sent / total) * 100
+            self._write(f"📈 成功率: {success_rate:.1f}%")
         
-        elif event_type == "result":
-            print(f"\n{'='*50}")
-            print("🎉 処理完了!")
-            print(f"{'='*50}")
-            print(f"📊 処理対象: {event['total']}個")
-            print(f"✅ 成功: {event['sent']}個")
-            print(f"❌ 失敗: {event['failed']}個")
-            
-            if event['total'] > 0:
-                success_rate = (event['sent'] / event['total']) * 100
-                print(f"📈 成功率: {success_rate:.1f}%")
-            
-            print(f"{'='*50}")
-    
-    def _handle_quiet(self, event):
+        self._write(self._BANNER)
+    
+    def _handle_quiet(self, event, event_type):
         """静音モードの出力処理"""
-        event_type = event.get("type")
-        
-        if event_type == "loaded":
-            print(f"Loaded {event['total']} prompts")
-        elif event_type == "result":
-            total = event['total']
-            sent = event['sent']
-            failed = event['failed']
-            print(f"Completed: {sent}/{total} successful, {failed} failed")
+        handler = self._quiet_dispatch.get(event_type)
+        if handler:
+            handler(event)
+    
+    def _on_quiet_loaded(self, event):
+        """プロンプト読み込み完了（静音モード）"""
+        self._write(f"Loaded {event['total']} prompts")
+    
+    def _on_quiet_result(self, event):
+        """最終結果（静音モード）"""
+        total = event['total']
+        sent = event['sent']
+        failed = event['failed']
+        self._write(f"Completed: {sent}/{total} successful, {failed} failed")
     
     def finalize(self):
         """最終出力処理"""
@@ -204,15 +436,8 @@ class OutputHandler:
                 "sent": self.final_result["sent"],
                 "failed": self.final_result["failed"]
             }
-            try:
-                print(json.dumps(output, ensure_ascii=False))
-            except UnicodeEncodeError as e:
-                error_char = e.object[e.start:e.end] if hasattr(e, 'object') else '不明'
-                error_output = {
-                    "status": "error",
-                    "error": f"特殊文字エラー: '{error_char}' (cp932でエンコードできない文字が含まれています)"
-                }
-                print(json.dumps(error_output, ensure_ascii=True))
+            self._write_json(output)
+        self.flush()
     
     def error(self, error_msg, error_type="error"):
         """エラー出力"""
@@ -224,36 +449,38 @@ class OutputHandler:
                 "failed": 0,
                 "error": str(error_msg)
             }
-            try:
-                print(json.dumps(output, ensure_ascii=False))
-            except UnicodeEncodeError as e:
-                error_char = e.object[e.start:e.end] if hasattr(e, 'object') else '不明'
-                output["error"] = f"特殊文字エラー: '{error_char}' (cp932でエンコードできない文字が含まれています)"
-                print(json.dumps(output, ensure_ascii=True))
+            self._write_json(output)
         elif self.mode == "ndjson":
-            try:
-                print(json.dumps({
-                    "type": "error",
-                    "error_type": error_type,
-                    "message": str(error_msg)
-                }, ensure_ascii=False))
-            except UnicodeEncodeError as e:
-                error_char = e.object[e.start:e.end] if hasattr(e, 'object') else '不明'
-                print(json.dumps({
-                    "type": "error",
-                    "error_type": "UnicodeEncodeError",
-                    "message": f"特殊文字エラー: '{error_char}' (cp932でエンコードできない文字が含まれています)"
-                }, ensure_ascii=True))
+            self._write_json({
+                "type": "error",
+                "error_type": error_type,
+                "message": str(error_msg)
+            })
         else:
-            try:
-                print(f"Error: {error_msg}", file=sys.stderr)
-            except UnicodeEncodeError as e:
-                error_char = e.object[e.start:e.end] if hasattr(e, 'object') else '不明'
-                print(f"Error: 特殊文字エラー: '{error_char}' (cp932でエンコードできない文字が含まれています)", file=sys.stderr)
+            print(f"Error: {error_msg}", file=sys.stderr)
+        self.flush()
+
+
+# create_parser() が構築したパーサーのキャッシュ
+_PARSER = None
 
 
 def create_parser():
+    """コマンドライン引数パーサーを取得（初回のみ構築し、以降は同じものを返す）
+
+    argparse 自体がスレッドセーフではないため、複数スレッドからの同時利用は想定しない
+    """
+    global _PARSER
+    if _PARSER is None:
+        _PARSER = _build_parser()
+    return _PARSER
+
+
+def _build_parser():
     """コマンドライン引数パーサーを作成"""
+    # argparse は import とパーサー構築が重いため、高速パスで解析できない場合のみ読み込む
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="ChatGPT GUI自動操作 - プロンプト一括送信ツール (イベント駆動版)",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -417,6 +644,121 @@ def create_parser():
     return parser
 
 
+# 高速パスで解析するオプション -> (属性名, 型)。型が None のものはフラグ
+_FAST_OPTIONS = {
+    "--csv": ("csv", str),
+    "--wait": ("wait", int),
+    "--json": ("json", None),
+    "--ndjson": ("ndjson", None),
+    "--quiet": ("quiet", None),
+    "--interactive": ("interactive", None),
+    "--verbose": ("verbose", None),
+    "--dry-run": ("dry_run", None),
+    "--csv-mode": ("csv_mode", None),
+    "--max-items": ("max_items", int),
+    "--retry": ("retry", int),
+    "--prefix": ("prefix", str),
+    "--suffix": ("suffix", str),
+    "--short-sleep": ("short_sleep", float),
+    "--long-sleep": ("long_sleep", float),
+}
+
+# 高速パスの既定値（_build_parser() の default と一致させること）
+_FAST_DEFAULTS = {
+    "csv": None,
+    "wait": 60,
+    "profile_dir": None,
+    "pause_for_login": False,
+    "json": False,
+    "ndjson": False,
+    "quiet": False,
+    "interactive": False,
+    "verbose": False,
+    "config": None,
+    "log_file": None,
+    "log_level": None,
+    "dry_run": False,
+    "max_items": None,
+    "retry": 0,
+    "prefix": "",
+    "suffix": "",
+    "short_sleep": None,
+    "long_sleep": None,
+    "csv_mode": False,
+}
+
+
+def _fast_parse_args(argv):
+    """よく使う引数の形だけを argparse を使わずに解析
+
+    未知のオプション・値の変換失敗・排他オプションの同時指定などは None を返し、
+    argparse による通常の解析（エラーメッセージや --help を含む）に任せる
+    """
+    values = dict(_FAST_DEFAULTS)
+    i = 0
+    while i < len(argv):
+        spec = _FAST_OPTIONS.get(argv[i])
+        if spec is None:
+            return None
+        dest, convert = spec
+        if convert is None:
+            values[dest] = True
+            i += 1
+            continue
+        # 値の欠落や "-" で始まる値の扱いは argparse に任せる
+        if i + 1 >= len(argv) or argv[i + 1].startswith("-"):
+            return None
+        try:
+            values[dest] = convert(argv[i + 1])
+        except ValueError:
+            return None
+        i += 2
+
+    if values["json"] + values["ndjson"] + values["quiet"] > 1:
+        return None
+    return SimpleNamespace(**values)
+
+
+# イベントキューの上限（出力が詰まった場合はコア側を待たせる）
+EVENT_QUEUE_SIZE = 2048
+
+# イベント待ちのタイムアウト（秒）
+# Windowsではロック待ち中にシグナルハンドラーが動かないため、短く区切って待つ
+EVENT_POLL_INTERVAL = 0.2
+
+# イベント列の終端を示す番兵
+_END_OF_EVENTS = object()
+
+
+def _produce_events(events, process_args):
+    """iter_process_prompts を実行し、イベントをキューに積む（プロデューサースレッド）
+
+    例外は握りつぶさずキュー経由でメインスレッドに渡す
+    """
+    try:
+        for event in iter_process_prompts(**process_args):
+            events.put(event)
+    except BaseException as e:
+        events.put(e)
+    else:
+        events.put(_END_OF_EVENTS)
+
+
+def _stop_producer(producer, events, stop_flag):
+    """プロデューサースレッドに停止を指示し、終了を待つ
+
+    終了するまでキューを読み捨て、put() で止まったままにならないようにする
+    """
+    if producer.is_alive():
+        stop_flag.set()
+    while producer.is_alive():
+        try:
+            events.get(timeout=EVENT_POLL_INTERVAL)
+        except queue.Empty:
+            pass
+    producer.join()
+
+
 def setup_signal_handling(stop_flag):
     """シグナルハンドリング設定"""
     def signal_handler(signum, frame):
@@ -429,14 +771,21 @@ def setup_signal_handling(stop_flag):
 
 def main():
     """CLI メイン処理"""
-    parser = create_parser()
-    
-    # 引数解析
+    # 標準出力・標準エラーをUTF-8に統一（cp932で出力できない文字でも例外にしない）
     try:
-        args = parser.parse_args()
-    except SystemExit as e:
-        # argparse内部でのエラー（--help含む）
-        sys.exit(e.code if e.code is not None else 1)
+        sys.stdout.reconfigure(encoding='utf-8', errors='backslashreplace')
+        sys.stderr.reconfigure(encoding='utf-8', errors='backslashreplace')
+    except Exception:
+        pass
+    
+    # 引数解析（よく使う形は高速パス、それ以外は argparse）
+    args = _fast_parse_args(sys.argv[1:])
+    if args is None:
+        try:
+            args = create_parser().parse_args()
+        except SystemExit as e:
+            # argparse内部でのエラー（--help含む）
+            sys.exit(e.code if e.code is not None else 1)
     
     # 設定ファイル読み込みと設定マージ
     config = create_config(config_file=args.config, cli_args=args)
@@ -482,30 +831,56 @@ def main():
     stop_flag = threading.Event()
     setup_signal_handling(stop_flag)
     
+    process_args = {
+        "csv_path": str(csv_path),
+        "wait": wait_time,
+        "profile_dir": config.get('profile_dir'),
+        "pause_for_login": config.get('pause_for_login', False),
+        "stop_flag": stop_flag,
+        "logger": logger,
+        "dry_run": config.get('dry_run', False),
+        "max_items": config.get('max_items'),
+        "retry": config.get('retry', 0),
+        "prefix": config.get('prefix', ''),
+        "suffix": config.get('suffix', ''),
+        "short_sleep": config.get('short_sleep'),
+        "long_sleep": config.get('long_sleep'),
+        "use_csv_mode": config.get('use_csv_mode', False)
+    }
+    
     try:
-        # イベント駆動処理実行
+        # イベント駆動処理実行（GUI操作は別スレッド、出力はメインスレッド）
+        events = queue.Queue(maxsize=EVENT_QUEUE_SIZE)
+        producer = threading.Thread(target=_produce_events, args=(events, process_args), daemon=True)
+        producer.start()
+        
         result = None
-        for event in iter_process_prompts(
-            csv_path=str(csv_path),
-            wait=wait_time,
-            profile_dir=config.get('profile_dir'),
-            pause_for_login=config.get('pause_for_login', False),
-            stop_flag=stop_flag,
-            logger=logger,
-            dry_run=config.get('dry_run', False),
-            max_items=config.get('max_items'),
-            retry=config.get('retry', 0),
-            prefix=config.get('prefix', ''),
-            suffix=config.get('suffix', ''),
-            short_sleep=config.get('short_sleep'),
-            long_sleep=config.get('long_sleep'),
-            use_csv_mode=config.get('use_csv_mode', False)
-        ):
-            output_handler.handle_event(event)
-            
-            # 最終結果を保存
-            if event.get("type") == "result":
-                result = {k: v for k, v in event.items() if k != "type"}
+        handler_wants = output_handler.wants_all_events
+        try:
+            while True:
+                try:
+                    event = events.get(timeout=EVENT_POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+                if event is _END_OF_EVENTS:
+                    break
+                if isinstance(event, BaseException):
+                    raise event
+                
+                is_result = event.get("type") == "result"
+                if handler_wants or is_result:
+                    output_handler.handle_event(event)
+                
+                # 最終結果を保存（読み取り専用なのでコピーせず参照を保持）
+                if is_result:
+                    result = event
+                
+                # 次のイベントが届いていない = コアが待機・GUI操作中なので、ここで書き出す
+                if events.empty():
+                    output_handler.flush()
+        finally:
+            # 出力エラー等で抜けた場合も、GUI操作を止めて後処理（done ログの反映など）を終えてから終了する
+            _stop_producer(producer, events, stop_flag)
         
         # 最終出力処理
         output_handler.finalize()
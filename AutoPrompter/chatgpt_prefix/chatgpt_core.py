@@ -7,17 +7,25 @@ UIとコア機能を完全分離、イベント駆動アーキテクチャで実
 print文は一切含まず、全ての進捗情報はイベントで通知
 """
 
+import codecs
 import csv
+import hashlib
+import ctypes
+from ctypes import wintypes
 import pyautogui
 import pyperclip
 import time
 import os
+import sys
 import win32gui
 import win32con
+import win32process
+import itertools
 from pathlib import Path
-from typing import Generator, Dict, Any, Optional, List, Tuple
+from typing import Generator, Iterator, Dict, Any, Optional, List, Tuple
 import threading
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 
 # カスタム例外
@@ -31,6 +39,92 @@ class RunError(Exception):
     pass
 
 
+# ========================================
+# SendInput による一括入力
+# ========================================
+# pyautogui は1操作ごとに Python 側の処理と待機が入るため、
+# クリック・Ctrl+A・Ctrl+V などの一連の操作を INPUT 配列にまとめて1回で送る
+
+try:
+    _user32 = ctypes.windll.user32
+except AttributeError:
+    # Windows 以外（pyautogui にフォールバック）
+    _user32 = None
+
+_INPUT_MOUSE = 0
+_INPUT_KEYBOARD = 1
+_KEYEVENTF_KEYUP = 0x0002
+_MOUSEEVENTF_LEFTDOWN = 0x0002
+_MOUSEEVENTF_LEFTUP = 0x0004
+
+_VK_CONTROL = 0x11
+_VK_RETURN = 0x0D
+_VK_A = 0x41
+_VK_V = 0x56
+
+
+class _MOUSEINPUT(ctypes.Structure):
+    _fields_ = [
+        ("dx", wintypes.LONG),
+        ("dy", wintypes.LONG),
+        ("mouseData", wintypes.DWORD),
+        ("dwFlags", wintypes.DWORD),
+        ("time", wintypes.DWORD),
+        ("dwExtraInfo", ctypes.c_size_t)
+    ]
+
+
+class _KEYBDINPUT(ctypes.Structure):
+    _fields_ = [
+        ("wVk", wintypes.WORD),
+        ("wScan", wintypes.WORD),
+        ("dwFlags", wintypes.DWORD),
+        ("time", wintypes.DWORD),
+        ("dwExtraInfo", ctypes.c_size_t)
+    ]
+
+
+class _HARDWAREINPUT(ctypes.Structure):
+    _fields_ = [
+        ("uMsg", wintypes.DWORD),
+        ("wParamL", wintypes.WORD),
+        ("wParamH", wintypes.WORD)
+    ]
+
+
+class _INPUTUNION(ctypes.Union):
+    _fields_ = [("mi", _MOUSEINPUT), ("ki", _KEYBDINPUT), ("hi", _HARDWAREINPUT)]
+
+
+class _INPUT(ctypes.Structure):
+    _fields_ = [("type", wintypes.DWORD), ("u", _INPUTUNION)]
+
+
+def _mouse_click_inputs():
+    """現在のカーソル位置での左クリック（押下・解放）"""
+    return [
+        _INPUT(type=_INPUT_MOUSE, u=_INPUTUNION(mi=_MOUSEINPUT(dwFlags=_MOUSEEVENTF_LEFTDOWN))),
+        _INPUT(type=_INPUT_MOUSE, u=_INPUTUNION(mi=_MOUSEINPUT(dwFlags=_MOUSEEVENTF_LEFTUP)))
+    ]
+
+
+def _key_combo_inputs(*vks):
+    """キーの同時押し（指定順に押下し、逆順に解放）"""
+    inputs = [_INPUT(type=_INPUT_KEYBOARD, u=_INPUTUNION(ki=_KEYBDINPUT(wVk=vk))) for vk in vks]
+    inputs += [
+        _INPUT(type=_INPUT_KEYBOARD, u=_INPUTUNION(ki=_KEYBDINPUT(wVk=vk, dwFlags=_KEYEVENTF_KEYUP)))
+        for vk in reversed(vks)
+    ]
+    return inputs
+
+
+def _send_inputs(inputs):
+    """INPUT 配列を1回の SendInput で送信（全件送れたら True）"""
+    count = len(inputs)
+    array = (_INPUT * count)(*inputs)
+    return _user32.SendInput(count, array, ctypes.sizeof(_INPUT)) == count
+
+
 class ChatGPTCore:
     """ChatGPT GUI操作のコア機能（イベント駆動版）"""
 
@@ -43,11 +137,19 @@ class ChatGPTCore:
     # 高速PC: 0.2 / 中速PC: 0.3 / 低速PC: 0.5
     SHORT_SLEEP = 0.3
 
-    # 長スリープ - 重い処理(貼り付け反映, ウィンドウアクティブ化)の待機時間
-    # 使用箇所: ウィンドウアクティブ化後, Ctrl+V貼り付け後
+    # 長スリープ - 重い処理(貼り付け反映)の待機時間
+    # 使用箇所: Ctrl+V貼り付け後
     # 高速PC: 0.5 / 中速PC: 1.0 / 低速PC: 1.5
     LONG_SLEEP = 1.0
 
+    # キー・マウス入力の送信方法
+    # True: SendInput で1回にまとめて送信（高速、送れなかった場合は pyautogui に切り替え）
+    # False: 常に pyautogui で送信（操作ごとに SHORT_SLEEP を挟む従来の方法）
+    USE_SENDINPUT = True
+
+    # クリップボードへのコピー完了を待つ最大秒数（コピーはウィンドウのアクティブ化と並行して行う）
+    CLIPBOARD_TIMEOUT = 2.0
+
     def __init__(self, wait=60, profile_dir=None, pause_for_login=False, stop_flag=None, logger=None, dry_run=False, max_items=None, retry=0, prefix="", suffix="", short_sleep=None, long_sleep=None):
         self.wait = wait
         self.profile_dir = profile_dir
@@ -64,6 +166,22 @@ class ChatGPTCore:
         self.chatgpt_window_handle = None
         self.original_window_handle = None
 
+        # 対象ウィンドウの情報（実行中は変わらないため、ハンドル記録時に1回だけ取得）
+        self._target_title = None
+        self._target_thread_id = None
+
+        # 読み込み時に判定したCSVのエンコーディング（done列の更新でも同じものを使う）
+        self._csv_encoding = None
+
+        # done ログの書き込み用ファイル（最初の追記時に開く）
+        self._done_log = None
+
+        # 標準出力・標準エラーが cp932 の場合のみ、ウィンドウタイトルを cp932 で表せる文字に置き換える
+        self._cp932_console = any(self._is_cp932(stream) for stream in (sys.stdout, sys.stderr))
+
+        # クリップボードコピー用のスレッド（最初のコピー時に作成）
+        self._clipboard_executor = None
+
         # GUIから渡された値を使用、なければクラス定数を使用
         self.SHORT_SLEEP = short_sleep if short_sleep is not None else self.SHORT_SLEEP
         self.LONG_SLEEP = long_sleep if long_sleep is not None else self.LONG_SLEEP
@@ -72,19 +190,41 @@ class ChatGPTCore:
         # pyautogui.FAILSAFE = True  # コメントアウト: マウスを隅に移動した時の強制停止を無効化（GUIのStopボタンで停止可能）
         pyautogui.FAILSAFE = True
         pyautogui.PAUSE = 0.0  # カスタムスリープで制御するため無効化
+        # PAUSE 以外の内部待機（移動時間の下限・sleep の下限）も無効化
+        pyautogui.MINIMUM_DURATION = 0
+        pyautogui.MINIMUM_SLEEP = 0
+        pyautogui.DARWIN_CATCH_UP_TIME = 0
     
     def _check_stop(self):
         """緊急停止チェック"""
         if self.stop_flag.is_set():
             raise KeyboardInterrupt("Process stopped by user")
 
+    def _wait(self, seconds):
+        """seconds 秒待機（待機中に緊急停止されたら、その時点で中断）"""
+        if self.stop_flag.wait(seconds):
+            raise KeyboardInterrupt("Process stopped by user")
+
+    @staticmethod
+    def _is_cp932(stream):
+        """ストリームのエンコーディングが cp932 か"""
+        encoding = getattr(stream, 'encoding', None)
+        if not encoding:
+            return False
+        try:
+            return codecs.lookup(encoding).name == 'cp932'
+        except LookupError:
+            return False
+
     def _get_window_title(self, hwnd):
-        """ウィンドウハンドルからウィンドウタイトルを取得（cp932非対応文字を安全に処理）"""
+        """ウィンドウハンドルからウィンドウタイトルを取得（cp932コンソールではcp932非対応文字を安全に処理）"""
         try:
             if hwnd:
                 title = win32gui.GetWindowText(hwnd)
                 if not title:
                     return f"<No Title> (Handle: {hwnd})"
+                if not self._cp932_console:
+                    return title
 
                 # cp932でエンコードできない文字を安全に処理
                 try:
@@ -99,6 +239,27 @@ class ChatGPTCore:
         except Exception as e:
             return f"<Error getting title: {e}>"
     
+    def set_target_window(self, hwnd):
+        """操作対象のウィンドウハンドルを記録し、タイトルとスレッドIDをキャッシュ"""
+        self.chatgpt_window_handle = hwnd
+        self._cache_target_window()
+        return self._target_title
+
+    def _cache_target_window(self):
+        """対象ウィンドウのタイトルとスレッドIDを取得して保持"""
+        hwnd = self.chatgpt_window_handle
+        self._target_title = self._get_window_title(hwnd)
+        try:
+            self._target_thread_id = win32process.GetWindowThreadProcessId(hwnd)[0]
+        except Exception as e:
+            self.logger.debug(f"GetWindowThreadProcessId failed: {e}")
+            self._target_thread_id = None
+
+    def _invalidate_target_window(self):
+        """対象ウィンドウのキャッシュを破棄（次回のアクティブ化で取得し直す）"""
+        self._target_title = None
+        self._target_thread_id = None
+
     def find_chatgpt_window(self):
         """ChatGPTウィンドウを検索してハンドルを取得（座標記録時に実際のウィンドウを記録）"""
         self.logger.debug("Window will be captured during coordinate setup...")
@@ -115,77 +276,48 @@ class ChatGPTCore:
             self.logger.error("ChatGPT window handle not captured yet")
             return False
 
-        # 現在のフォアグラウンドウィンドウを記録
+        # 現在のフォアグラウンドウィンドウを記録（対象ウィンドウの情報はキャッシュを使う）
         self.original_window_handle = win32gui.GetForegroundWindow()
-        current_title = self._get_window_title(self.original_window_handle)
-        target_title = self._get_window_title(self.chatgpt_window_handle)
 
-        self.logger.debug(f"Attempting to activate window: '{target_title}'")
-        self.logger.debug(f"Current foreground window: '{current_title}'")
+        # 既に対象ウィンドウが最前面なら何もしない
+        # （GetForegroundWindow は1回のシステムコールで済むため、フックで前面の変化を追跡するより確実で軽い）
+        if self.original_window_handle == self.chatgpt_window_handle:
+            return True
+
+        if self._target_title is None:
+            self._cache_target_window()
+        target_title = self._target_title
+
+        # デバッグ出力が無効なら、現在のウィンドウタイトル取得も文字列整形も行わない
+        debug = self.logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            current_title = self._get_window_title(self.original_window_handle)
+            self.logger.debug(f"Attempting to activate window: '{target_title}'")
+            self.logger.debug(f"Current foreground window: '{current_title}'")
 
         # 最大3回リトライ
         max_attempts = 3
         for attempt in range(max_attempts):
             try:
                 if attempt > 0:
-                    self.logger.debug(f"Retry attempt {attempt + 1}/{max_attempts}")
+                    if debug:
+                        self.logger.debug(f"Retry attempt {attempt + 1}/{max_attempts}")
                     time.sleep(1.0)  # リトライ前に待機（0.5秒→1.0秒に延長）
 
-                # 方法1: ウィンドウを表示状態にする（隠れている場合に備えて）
-                win32gui.ShowWindow(self.chatgpt_window_handle, win32con.SW_SHOW)
-                time.sleep(0.2)
-
-                # 方法2: ウィンドウを最小化状態から復元
-                win32gui.ShowWindow(self.chatgpt_window_handle, win32con.SW_RESTORE)
-                time.sleep(0.2)
-
-                # 方法3: Z-orderで最前面に持ってくる
-                win32gui.BringWindowToTop(self.chatgpt_window_handle)
-                time.sleep(0.2)
-
-                # 方法4: 最前面ウィンドウとして強制設定
-                try:
-                    win32gui.SetWindowPos(
-                        self.chatgpt_window_handle,
-                        win32con.HWND_TOPMOST,  # HWND_TOP → HWND_TOPMOSTに変更（常に最前面）
-                        0, 0, 0, 0,
-                        win32con.SWP_NOMOVE | win32con.SWP_NOSIZE | win32con.SWP_SHOWWINDOW
-                    )
-                    time.sleep(0.3)
-
-                    # HWND_TOPMOSTを解除して通常の最前面ウィンドウに戻す
-                    win32gui.SetWindowPos(
-                        self.chatgpt_window_handle,
-                        win32con.HWND_NOTOPMOST,
-                        0, 0, 0, 0,
-                        win32con.SWP_NOMOVE | win32con.SWP_NOSIZE | win32con.SWP_SHOWWINDOW
-                    )
-                    time.sleep(0.2)
-                except Exception as e:
-                    self.logger.debug(f"SetWindowPos failed: {e}")
-
-                # 方法5: Alt押下でフォーカス制限を解除
-                # Windowsのフォーカス制限を回避するために、Altキーを押して離す
-                try:
-                    import win32api
-                    import win32con as wcon
-                    # Altキーを押す
-                    win32api.keybd_event(wcon.VK_MENU, 0, 0, 0)
-                    time.sleep(0.05)
-                    # Altキーを離す
-                    win32api.keybd_event(wcon.VK_MENU, 0, win32con.KEYEVENTF_KEYUP, 0)
-                    time.sleep(0.1)
-                except Exception as e:
-                    self.logger.debug(f"Alt key simulation failed: {e}")
+                # 方法1: ウィンドウを最小化状態から復元（最小化されている場合のみ）
+                # 表示・Z-order の変更は次の SetForegroundWindow が同期的に行うので、ここでは待たない
+                if win32gui.IsIconic(self.chatgpt_window_handle):
+                    win32gui.ShowWindow(self.chatgpt_window_handle, win32con.SW_RESTORE)
 
-                # 方法6: フォアグラウンドウィンドウに設定
+                # 方法2: フォアグラウンドウィンドウに設定
                 # AttachThreadInputを使ってフォーカスを強制的に奪取
                 try:
-                    import win32process
                     # 現在のスレッドIDを取得
                     current_thread_id = win32process.GetCurrentThreadId()
-                    # ターゲットウィンドウのスレッドIDを取得
-                    target_thread_id = win32process.GetWindowThreadProcessId(self.chatgpt_window_handle)[0]
+                    # ターゲットウィンドウのスレッドID（キャッシュ済み）
+                    target_thread_id = self._target_thread_id
+                    if target_thread_id is None:
+                        raise RuntimeError("target thread id not available")
 
                     # スレッドを接続
                     if current_thread_id != target_thread_id:
@@ -207,20 +339,24 @@ class ChatGPTCore:
                     except Exception as e2:
                         self.logger.debug(f"SetForegroundWindow also failed: {e2}")
 
-                time.sleep(self.LONG_SLEEP)  # ウィンドウ切り替え後の待機（SHORT_SLEEP→LONG_SLEEPに変更）
+                time.sleep(self.SHORT_SLEEP)  # ウィンドウ切り替え後の待機（直後に切り替わったか確認する）
 
                 # アクティブ化後の確認
                 activated_handle = win32gui.GetForegroundWindow()
-                activated_title = self._get_window_title(activated_handle)
 
                 if activated_handle == self.chatgpt_window_handle:
-                    self.logger.debug(f"Successfully activated window: '{target_title}' (attempt {attempt + 1})")
+                    if debug:
+                        self.logger.debug(f"Successfully activated window: '{target_title}' (attempt {attempt + 1})")
                     return True
                 else:
+                    activated_title = self._get_window_title(activated_handle)
                     self.logger.warning(f"Attempt {attempt + 1}: Window activation incomplete. Target: '{target_title}', Actual: '{activated_title}'")
 
             except Exception as e:
                 self.logger.warning(f"Attempt {attempt + 1} failed: {e}")
+                # ウィンドウが閉じられた等でハンドルが無効になった場合はキャッシュを破棄
+                if not win32gui.IsWindow(self.chatgpt_window_handle):
+                    self._invalidate_target_window()
                 if attempt == max_attempts - 1:
                     # 最後の試行でも失敗
                     self.logger.error(f"Failed to activate window '{target_title}' after {max_attempts} attempts: {e}")
@@ -230,6 +366,53 @@ class ChatGPTCore:
         self.logger.error(f"Failed to activate window '{target_title}' after {max_attempts} attempts")
         return False
     
+    def paste_prompt(self):
+        """入力欄をクリックし、既存テキストを全選択してクリップボードから貼り付け
+
+        クリック → Ctrl+A → Ctrl+V を1回の SendInput でまとめて送る。
+        OSの入力キューが順序を保証するため、操作間の待機は入れない。
+        SendInput は pyautogui を通らないため、カーソルを動かす前に FAILSAFE（画面の隅で停止）を自前で確認する
+        """
+        if self.USE_SENDINPUT and _user32 is not None:
+            pyautogui.failSafeCheck()
+            _user32.SetCursorPos(self.input_x, self.input_y)
+            inputs = _mouse_click_inputs()
+            inputs += _key_combo_inputs(_VK_CONTROL, _VK_A)
+            inputs += _key_combo_inputs(_VK_CONTROL, _VK_V)
+            if _send_inputs(inputs):
+                return
+            self.logger.debug("SendInput was blocked, falling back to pyautogui")
+
+        pyautogui.click(self.input_x, self.input_y, _pause=False)
+        time.sleep(self.SHORT_SLEEP)
+        pyautogui.hotkey('ctrl', 'a', interval=0, _pause=False)
+        time.sleep(self.SHORT_SLEEP)
+        pyautogui.hotkey('ctrl', 'v', interval=0, _pause=False)
+
+    def submit_prompt(self):
+        """Enterキーで送信"""
+        if self.USE_SENDINPUT and _user32 is not None:
+            pyautogui.failSafeCheck()  # SendInput は pyautogui の FAILSAFE を通らない
+            if _send_inputs(_key_combo_inputs(_VK_RETURN)):
+                return
+        pyautogui.press('enter', _pause=False)
+
+    def copy_to_clipboard_async(self, text):
+        """クリップボードへのコピーを別スレッドで開始し、完了待ち用の Future を返す
+
+        クリップボードはフォアグラウンドウィンドウと無関係なので、アクティブ化と並行して進められる。
+        貼り付け前に result(timeout=CLIPBOARD_TIMEOUT) で完了を待つこと
+        """
+        if self._clipboard_executor is None:
+            self._clipboard_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="clipboard")
+        return self._clipboard_executor.submit(pyperclip.copy, text)
+
+    def shutdown_clipboard(self):
+        """クリップボードコピー用のスレッドを終了"""
+        if self._clipboard_executor is not None:
+            self._clipboard_executor.shutdown(wait=True)
+            self._clipboard_executor = None
+
     def restore_original_window(self):
         """元のアクティブウィンドウに戻す"""
         if self.original_window_handle:
@@ -238,15 +421,67 @@ class ChatGPTCore:
             except Exception:
                 pass
     
-    def load_prompts(self, csv_path, use_csv_mode=False) -> List[Tuple[str, str, str]]:
-        """CSVファイルからプロンプトを読み込み（複数エンコーディング対応・CSV/GUIモード切り替え）
+    # CSVの判定対象エンコーディング（BOM付きUTF-8 → UTF-8 → CP932 の順に判定）
+    CSV_ENCODINGS = ('utf-8-sig', 'utf-8', 'cp932')
+
+    # エンコーディング判定のために読む先頭バイト数
+    ENCODING_SNIFF_BYTES = 65536
+
+    # CSV書き換え時の書き込みバッファサイズ（通常のCSVなら1回の write で書き切れる大きさ）
+    WRITE_BUFFER_SIZE = 1 << 20
+
+    # done列で処理済みとみなす値
+    DONE_VALUES = frozenset(('1', 'true', 'yes', 'on'))
+
+    @classmethod
+    def _is_done(cls, value):
+        """done列の値が処理済みを示すか（空欄は lower() せずに即 False）"""
+        return bool(value) and value.lower() in cls.DONE_VALUES
+
+    def _detect_encoding(self, csv_path):
+        """CSVファイルのエンコーディングを判定（結果は self._csv_encoding に保持して再利用）
+
+        BOMがあれば UTF-8 with BOM、先頭部分が UTF-8 として読めれば UTF-8、それ以外は CP932
+        """
+        if self._csv_encoding is not None:
+            return self._csv_encoding
+
+        with open(csv_path, 'rb') as f:
+            head = f.read(self.ENCODING_SNIFF_BYTES)
+
+        if head.startswith(codecs.BOM_UTF8):
+            encoding = 'utf-8-sig'
+        else:
+            try:
+                # 末尾で途切れたマルチバイト文字はエラーにしない
+                codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+                encoding = 'utf-8'
+            except UnicodeDecodeError:
+                encoding = 'cp932'
+
+        self._csv_encoding = encoding
+        return encoding
+
+    @staticmethod
+    def _column_indices(header):
+        """ヘッダー行から 列名 -> 列番号 の辞書を作成（同名の列は後ろを優先、DictReader と同じ）"""
+        return {name: i for i, name in enumerate(header)}
+
+    def iter_prompts(self, csv_path, use_csv_mode=False) -> Iterator[Tuple[str, str, int]]:
+        """CSVファイルから未処理のプロンプトを1行ずつ読み込む（複数エンコーディング対応・CSV/GUIモード切り替え）
+
+        ファイル全体をリストに展開せず、行を読みながら (prompt, final_prompt, row_number) を返す。
+        final_prompt は prefix/suffix を適用済みの送信テキスト（送信ループで毎回連結しないよう読み込み時に作る）。
+        row_number はヘッダーを除いたデータ行の通し番号（空行は数えない）で、done ログの記録に使う。
+        done ログ（前回の中断時に反映されなかった処理済み行）に記録された行は、プロンプトが一致すれば未処理でもスキップする。
+        途中で読み込みをやめる場合は close() してファイルを閉じること
 
         Args:
             csv_path: CSVファイルパス
             use_csv_mode: Trueの場合CSV列からprefix/suffixを読み込み、Falseの場合GUIデフォルト値を使用
 
-        Returns:
-            List of (prompt, prefix, suffix) tuples
+        Yields:
+            (prompt, final_prompt, row_number) tuples
         """
         csv_path = Path(csv_path)
 
@@ -256,69 +491,78 @@ class ChatGPTCore:
             self.logger.error(f"CSV file not found: {csv_path}")
             raise InputError(f"CSV file not found: {csv_path}")
 
-        # 複数のエンコーディングを試行（UTF-8 with BOMを優先）
-        encodings = ['utf-8-sig', 'utf-8', 'cp932', 'shift-jis']
-        rows = None
-        successful_encoding = None
+        try:
+            encoding = self._detect_encoding(csv_path)
+        except Exception as e:
+            self.logger.error(f"Failed to read CSV file: {e}")
+            raise InputError(f"Failed to read CSV file: {e}")
+
+        logged_done = self._read_done_log(csv_path)
+
+        with open(csv_path, 'r', encoding=encoding, newline='') as f:
+            # DictReader は1行ごとに dict を作るため、csv.reader で列番号を使って読む
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if not header:
+                self.logger.error("Failed to read CSV file with any supported encoding")
+                raise InputError(f"Failed to read CSV file. Tried encodings: {', '.join(self.CSV_ENCODINGS)}")
+
+            columns = self._column_indices(header)
+
+            # prompt列の存在確認
+            if 'prompt' not in columns:
+                self.logger.error(f"'prompt' column not found in CSV. Available columns: {header}")
+                raise InputError("'prompt' column not found in CSV file")
+
+            prompt_idx = columns['prompt']
+            prefix_idx = columns.get('prefix')
+            suffix_idx = columns.get('suffix')
+            done_idx = columns.get('done')
+
+            # prefix/suffix列の存在確認
+            has_prefix = prefix_idx is not None
+            has_suffix = suffix_idx is not None
+
+            # デフォルト値（GUIから渡された値）
+            default_prefix = self.prefix
+            default_suffix = self.suffix
+            last_prefix = default_prefix
+            last_suffix = default_suffix
+
+            # CSV Modeでも列がない場合は警告を出してGUI Modeにフォールバック
+            if use_csv_mode and not has_prefix and not has_suffix:
+                self.logger.warning(f"CSV Mode selected but 'prefix' and 'suffix' columns not found in CSV. Available columns: {header}. Using GUI defaults instead.")
+                use_csv_mode = False
+
+            row_count = 0
+            for row in reader:
+                if not row:
+                    continue  # 空行（DictReader と同様に数えない）
+                row_count += 1
+                width = len(row)
 
-        for encoding in encodings:
-            try:
-                with open(csv_path, 'r', encoding=encoding, newline='') as f:
-                    reader = csv.DictReader(f)
-                    rows = list(reader)
-                successful_encoding = encoding
-                self.logger.debug(f"CSV loaded with {encoding} encoding, {len(rows)} rows")
-                break
-            except (UnicodeDecodeError, UnicodeError):
-                continue
-            except Exception as e:
-                if encoding == encodings[-1]:
-                    self.logger.error(f"Failed to read CSV file: {e}")
-                    raise InputError(f"Failed to read CSV file: {e}")
-                continue
-
-        if rows is None or len(rows) == 0:
-            self.logger.error("Failed to read CSV file with any supported encoding")
-            raise InputError(f"Failed to read CSV file. Tried encodings: {', '.join(encodings)}")
-
-        # prompt列の存在確認
-        if 'prompt' not in rows[0]:
-            self.logger.error(f"'prompt' column not found in CSV. Available columns: {list(rows[0].keys())}")
-            raise InputError("'prompt' column not found in CSV file")
-
-        # prefix/suffix列の存在確認
-        has_prefix = 'prefix' in rows[0]
-        has_suffix = 'suffix' in rows[0]
-
-        # デフォルト値（GUIから渡された値）
-        default_prefix = self.prefix
-        default_suffix = self.suffix
-        last_prefix = default_prefix
-        last_suffix = default_suffix
-
-        # CSV Modeでも列がない場合は警告を出してGUI Modeにフォールバック
-        if use_csv_mode and not has_prefix and not has_suffix:
-            available_columns = list(rows[0].keys())
-            self.logger.warning(f"CSV Mode selected but 'prefix' and 'suffix' columns not found in CSV. Available columns: {available_columns}. Using GUI defaults instead.")
-            use_csv_mode = False
-
-        result = []
-
-        if use_csv_mode and (has_prefix or has_suffix):
-            # CSV Mode: 各行のprefix/suffixを使用（空欄は前行引き継ぎ）
-            for row in rows:
                 # done列のチェック (1, true, yes, on ならスキップ)
-                done_val = str(row.get('done', '')).lower()
-                if done_val in ('1', 'true', 'yes', 'on'):
+                if done_idx is not None and done_idx < width and self._is_done(row[done_idx]):
                     continue
 
-                prompt = row.get('prompt', '').strip()
+                prompt = row[prompt_idx].strip() if prompt_idx < width else ''
                 if not prompt:
                     continue  # 空行スキップ
+                if logged_done and logged_done.get(row_count) == self._prompt_digest(prompt):
+                    continue
+
+                if not use_csv_mode:
+                    # GUI Mode: 全行でGUIデフォルト値を使用
+                    if default_prefix or default_suffix:
+                        yield prompt, f"{default_prefix}{prompt}{default_suffix}", row_count
+                    else:
+                        yield prompt, prompt, row_count
+                    continue
 
+                # CSV Mode: 各行のprefix/suffixを使用（空欄は前行引き継ぎ）
                 # prefix処理（列がない場合はデフォルト）
                 if has_prefix:
-                    prefix = row.get('prefix', '')  # .strip()を削除して前後の改行・空白を保持
+                    prefix = row[prefix_idx] if prefix_idx < width else ''  # 前後の改行・空白は保持
                     if prefix == '':  # 完全に空の場合のみ前行引き継ぎ
                         prefix = last_prefix
                     else:
@@ -328,7 +572,7 @@ class ChatGPTCore:
 
                 # suffix処理（列がない場合はデフォルト）
                 if has_suffix:
-                    suffix = row.get('suffix', '')  # .strip()を削除して前後の改行・空白を保持
+                    suffix = row[suffix_idx] if suffix_idx < width else ''  # 前後の改行・空白は保持
                     if suffix == '':  # 完全に空の場合のみ前行引き継ぎ
                         suffix = last_suffix
                     else:
@@ -336,99 +580,202 @@ class ChatGPTCore:
                 else:
                     suffix = default_suffix
 
-                result.append((prompt, prefix, suffix))
-        else:
-            # GUI Mode: 全行でGUIデフォルト値を使用
-            for row in rows:
-                # done列のチェック
-                done_val = str(row.get('done', '')).lower()
-                if done_val in ('1', 'true', 'yes', 'on'):
-                    continue
+                yield prompt, f"{prefix}{prompt}{suffix}" if (prefix or suffix) else prompt, row_count
 
-                prompt = row.get('prompt', '').strip()
-                if not prompt:
-                    continue
-                result.append((prompt, default_prefix, default_suffix))
+            if row_count == 0:
+                self.logger.error("Failed to read CSV file with any supported encoding")
+                raise InputError(f"Failed to read CSV file. Tried encodings: {', '.join(self.CSV_ENCODINGS)}")
+
+    def load_prompts(self, csv_path, use_csv_mode=False, max_items=None) -> List[Tuple[str, str, int]]:
+        """CSVファイルから未処理のプロンプトを読み込み
+
+        max_items を指定した場合はその件数に達した時点で読み込みを打ち切る
+
+        Returns:
+            List of (prompt, final_prompt, row_number) tuples
+        """
+        try:
+            result = self._collect_prompts(csv_path, use_csv_mode, max_items)
+        except UnicodeDecodeError:
+            # 先頭部分だけ UTF-8 として読めた CP932 ファイル
+            if self._csv_encoding != 'utf-8':
+                self.logger.error(f"Failed to decode CSV file as {self._csv_encoding}")
+                raise InputError(f"Failed to read CSV file. Tried encodings: {', '.join(self.CSV_ENCODINGS)}")
+            self._csv_encoding = 'cp932'
+            try:
+                result = self._collect_prompts(csv_path, use_csv_mode, max_items)
+            except UnicodeDecodeError:
+                self.logger.error("Failed to read CSV file with any supported encoding")
+                raise InputError(f"Failed to read CSV file. Tried encodings: {', '.join(self.CSV_ENCODINGS)}")
 
         if not result:
             self.logger.warning("No pending prompts found in CSV file (all done or empty)")
             raise InputError("No pending prompts found in CSV file (check 'done' column)")
 
-        self.logger.info(f"Loaded {len(result)} prompts (encoding: {successful_encoding}, mode: {'CSV' if use_csv_mode else 'GUI'})")
+        if max_items and len(result) == max_items:
+            self.logger.info(f"Limiting prompts to {max_items} items")
+
+        self.logger.info(f"Loaded {len(result)} prompts (encoding: {self._csv_encoding}, mode: {'CSV' if use_csv_mode else 'GUI'})")
         return result
+
+    def _collect_prompts(self, csv_path, use_csv_mode, max_items):
+        """iter_prompts() から最大 max_items 件を取り出す（打ち切った場合もファイルを閉じる）"""
+        prompts = self.iter_prompts(csv_path, use_csv_mode)
+        try:
+            return list(itertools.islice(prompts, max_items or None))
+        finally:
+            prompts.close()  # この後 CSV を書き換えるため、必ず閉じておく
     
-    def mark_prompt_as_done(self, csv_path, processed_prompt):
-        """処理済みプロンプトのdone列を1に更新（複数エンコーディング対応）"""
+    def _rewrite_done_column(self, csv_path, select):
+        """done列を書き換えたCSVを一時ファイルに書き出し、os.replace で差し替える
+
+        select(row_number, row, prompt_idx, done_idx) が True を返した行を done=1 にする。
+        途中で失敗しても元のCSVは壊れない。1行も更新しなかった場合は元のCSVをそのまま残す
+
+        Returns:
+            (更新した行数, データ行数)。読み込めない形式なら None
+        """
+        csv_path = Path(csv_path)
+        tmp_path = csv_path.with_name(csv_path.name + '.tmp')
+        try:
+            encoding = self._detect_encoding(csv_path)
+            updated = 0
+            row_count = 0
+
+            with open(csv_path, 'r', encoding=encoding, newline='') as src:
+                reader = csv.reader(src)
+                header = next(reader, None)
+                if not header:
+                    return None
+
+                columns = self._column_indices(header)
+                if 'prompt' not in columns:
+                    return None
+                prompt_idx = columns['prompt']
+
+                # done列がない場合は追加（既存の行は done=0）
+                add_done = 'done' not in columns
+                if add_done:
+                    header = header + ['done']
+                    done_idx = len(header) - 1
+                else:
+                    done_idx = columns['done']
+
+                # 同じエンコーディングで保存
+                with open(tmp_path, 'w', encoding=encoding, newline='',
+                          buffering=self.WRITE_BUFFER_SIZE) as dst:
+                    writer = csv.writer(dst)
+                    writer.writerow(header)
+                    for row in reader:
+                        if not row:
+                            continue  # 空行は書き戻さない（DictReader/DictWriter と同じ）
+                        row_count += 1
+                        if len(row) <= done_idx:
+                            row += [''] * (done_idx + 1 - len(row))
+                        if add_done:
+                            row[done_idx] = '0'
+                        if select(row_count, row, prompt_idx, done_idx):
+                            row[done_idx] = '1'
+                            updated += 1
+                        writer.writerow(row)
+
+            if updated:
+                os.replace(tmp_path, csv_path)
+            else:
+                os.remove(tmp_path)
+            return updated, row_count
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    # ========================================
+    # done ログ（処理済み行の追記ログ）
+    # ========================================
+    # 1件ごとにCSV全体を書き換えるとN件でO(N²)のI/Oになるため、
+    # 処理済みの行番号とプロンプトのハッシュを <CSV名>.done に追記しておき、実行終了時に1回だけCSVへ反映する。
+    # 反映時はハッシュを照合し、ログ記録後にCSVが編集されて行がずれた場合は別の行を done にしない。
+    # 途中で異常終了した場合も、次回の読み込み時にログの行はスキップされ、次の実行終了時に反映される
+
+    @staticmethod
+    def _done_log_path(csv_path):
+        """done ログのパス（prompts.csv -> prompts.done）"""
+        return Path(csv_path).with_suffix('.done')
+
+    @staticmethod
+    def _prompt_digest(prompt):
+        """done ログに記録するプロンプトのハッシュ（前後の空白を除いた prompt 列の値から作る）"""
+        return hashlib.sha1(prompt.encode('utf-8')).hexdigest()
+
+    def _read_done_log(self, csv_path):
+        """done ログに記録された 行番号 -> プロンプトのハッシュ の辞書（ログがなければ空）"""
+        path = self._done_log_path(csv_path)
+        if not path.exists():
+            return {}
+        logged = {}
+        with open(path, 'r', encoding='ascii') as f:
+            for line in f:
+                row_number, _, digest = line.strip().partition('\t')
+                if row_number.isdigit() and digest:
+                    logged[int(row_number)] = digest
+        return logged
+
+    def _remove_done_log(self, csv_path):
+        """done ログを削除（なければ何もしない。Path.unlink の missing_ok は 3.8 以降のため使わない）"""
         try:
-            # 複数のエンコーディングを試行して読み込み（UTF-8 with BOMを優先）
-            encodings = ['utf-8-sig', 'utf-8', 'cp932', 'shift-jis']
-            rows = None
-            fieldnames = None
-            successful_encoding = None
+            self._done_log_path(csv_path).unlink()
+        except FileNotFoundError:
+            pass
 
-            for encoding in encodings:
-                try:
-                    with open(csv_path, 'r', encoding=encoding, newline='') as f:
-                        reader = csv.DictReader(f)
-                        fieldnames = reader.fieldnames
-                        rows = list(reader)
-                    successful_encoding = encoding
-                    break
-                except (UnicodeDecodeError, UnicodeError):
-                    continue
-                except Exception:
-                    if encoding == encodings[-1]:
-                        return False, 0, 0
-                    continue
+    def log_prompt_done(self, csv_path, row_number, prompt):
+        """処理済みの行番号とプロンプトのハッシュを done ログに追記（CSVへの反映は apply_done_log で行う）"""
+        if self._done_log is None:
+            self._done_log = open(self._done_log_path(csv_path), 'a', encoding='ascii')
+        self._done_log.write(f"{row_number}\t{self._prompt_digest(prompt)}\n")
+        self._done_log.flush()
 
-            if rows is None or fieldnames is None:
-                return False, 0, 0
+    def apply_done_log(self, csv_path):
+        """done ログの行をまとめてCSVの done=1 に反映し、ログを削除
 
-            if 'prompt' not in fieldnames:
-                return False, 0, 0
-            
-            # done列がない場合は追加
-            if 'done' not in fieldnames:
-                fieldnames.append('done')
-                # 既存の行にdone=0を設定（これから処理する行以外）
-                for row in rows:
-                    row['done'] = '0'
-
-            original_count = len(rows)
-            # 処理済みプロンプトと一致する最初の1行のみ更新
-            found_first = False
-            updated_count = 0
-            
-            for row in rows:
-                # 既にdone=1になっているものはスキップ
-                current_done = str(row.get('done', '')).lower()
-                if current_done in ('1', 'true', 'yes', 'on'):
-                    continue
-                
-                if not found_first and row.get('prompt', '').strip() == processed_prompt.strip():
-                    row['done'] = '1'
-                    found_first = True
-                    updated_count += 1
-                    # 1つ見つけたらループを抜ける（同じプロンプトが複数ある場合の挙動によるが、
-                    # 順番に処理しているはずなので最初に見つかった未処理のものを更新）
-                    break
-            
-            # 同じエンコーディングで保存
-            with open(csv_path, 'w', encoding=successful_encoding, newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(rows)
-                
-            if found_first:
-                return True, original_count, original_count # 行数は変わらない
-            else:
-                # 更新対象が見つからなかった
-                self.logger.warning(f"Prompt not found in CSV for update: '{processed_prompt[:50]}...'")
-                return False, original_count, original_count
+        記録時とプロンプトが一致しない行（CSVが途中で編集された場合など）は反映しない。
+
+        Returns:
+            反映した行数（失敗した場合はログを残して 0）
+        """
+        if self._done_log is not None:
+            self._done_log.close()
+            self._done_log = None
+
+        logged_done = self._read_done_log(csv_path)
+        if not logged_done:
+            self._remove_done_log(csv_path)
+            return 0
+
+        def select(row_number, row, prompt_idx, done_idx):
+            digest = logged_done.get(row_number)
+            if digest is None:
+                return False
+            prompt = row[prompt_idx].strip() if prompt_idx < len(row) else ''
+            return digest == self._prompt_digest(prompt)
+
+        try:
+            rewritten = self._rewrite_done_column(csv_path, select)
         except Exception as e:
-            self.logger.error(f"Failed to update prompt status in CSV: {e}")
-            return False, 0, 0
+            self.logger.error(f"Failed to apply done log to CSV: {e}")
+            return 0
 
+        if rewritten is None:
+            self.logger.error("Failed to apply done log to CSV: unsupported CSV format")
+            return 0
+
+        updated = rewritten[0]
+        self._remove_done_log(csv_path)
+        if updated < len(logged_done):
+            self.logger.warning(f"Skipped {len(logged_done) - updated} done log entries that no longer match the CSV")
+        self.logger.info(f"Marked {updated} prompts as done in CSV")
+        return updated
 
 def iter_process_prompts(csv_path, wait=60, profile_dir=None, pause_for_login=False,
                         stop_flag=None, logger=None, dry_run=False, max_items=None, retry=0, prefix="", suffix="", short_sleep=None, long_sleep=None, use_csv_mode=False) -> Generator[Dict[str, Any], None, Dict[str, int]]:
@@ -466,15 +813,12 @@ def iter_process_prompts(csv_path, wait=60, profile_dir=None, pause_for_login=Fa
         yield {"type": "phase", "name": "initialization"}
         
         # プロンプト読み込み (use_csv_modeフラグを渡す)
-        prompts = core.load_prompts(csv_path, use_csv_mode)
-        
-        # max_items制限適用
-        if max_items and len(prompts) > max_items:
-            if logger:
-                logger.info(f"Limiting prompts from {len(prompts)} to {max_items} items")
-            prompts = prompts[:max_items]
+        # max_items制限はここで適用（上限に達した時点で読み込みを打ち切る）
+        prompts = core.load_prompts(csv_path, use_csv_mode, max_items)
         
         total_prompts = len(prompts)
+        # ループ内のデバッグログは、有効な場合のみ文字列を組み立てる
+        debug = bool(logger) and logger.isEnabledFor(logging.DEBUG)
         
         yield {
             "type": "loaded", 
@@ -527,19 +871,18 @@ def iter_process_prompts(csv_path, wait=60, profile_dir=None, pause_for_login=Fa
             for i in range(5, 0, -1):
                 core._check_stop()
                 yield {
-                    "type": "countdown", 
+                    "type": "countdown",
                     "seconds_left": i,
                     "phase": "coordinate_setup",
                     "message": "ChatGPTの入力欄にマウスカーソルを置いてください"
                 }
-                time.sleep(1)
+                core._wait(1)
             
             # 座標記録とアクティブウィンドウの同時取得
             core.input_x, core.input_y = pyautogui.position()
-            core.chatgpt_window_handle = win32gui.GetForegroundWindow()
+            window_title = core.set_target_window(win32gui.GetForegroundWindow())
 
             # 取得したウィンドウ情報をログに出力
-            window_title = core._get_window_title(core.chatgpt_window_handle)
             if logger:
                 logger.info(f"Target window captured: '{window_title}' (Handle: {core.chatgpt_window_handle})")
                 logger.info(f"Mouse position: ({core.input_x}, {core.input_y})")
@@ -561,12 +904,12 @@ def iter_process_prompts(csv_path, wait=60, profile_dir=None, pause_for_login=Fa
             for i in range(5, 0, -1):
                 core._check_stop()
                 yield {
-                    "type": "countdown", 
+                    "type": "countdown",
                     "seconds_left": i,
                     "phase": "processing_prep",
                     "message": "自動処理を開始します"
                 }
-                time.sleep(1)
+                core._wait(1)
         else:
             if logger:
                 logger.info("Dry-run mode: Skipping processing preparation countdown")
@@ -577,15 +920,17 @@ def iter_process_prompts(csv_path, wait=60, profile_dir=None, pause_for_login=Fa
         sent_count = 0
         failed_count = 0
         
-        for i, (prompt, row_prefix, row_suffix) in enumerate(prompts, 1):
+        for i, (prompt, final_prompt, row_number) in enumerate(prompts, 1):
             core._check_stop()
 
+            prompt_len = len(prompt)
+
             yield {
                 "type": "progress",
                 "step": "start",
                 "index": i,
                 "total": total_prompts,
-                "prompt": prompt[:50] + "..." if len(prompt) > 50 else prompt,
+                "prompt": prompt if prompt_len <= 50 else f"{prompt[:50]}...",
                 "dry_run": dry_run
             }
             
@@ -611,13 +956,13 @@ def iter_process_prompts(csv_path, wait=60, profile_dir=None, pause_for_login=Fa
                 try:
                     if dry_run:
                         # dry-runモードではGUI操作をスキップ
-                        if logger:
+                        if debug:
                             logger.debug(f"Dry-run mode: Simulating prompt {i} processing")
                         
                         yield {
-                            "type": "progress", 
+                            "type": "progress",
                             "step": "simulate",
-                            "index": i, 
+                            "index": i,
                             "total": total_prompts,
                             "dry_run": True
                         }
@@ -627,69 +972,43 @@ def iter_process_prompts(csv_path, wait=60, profile_dir=None, pause_for_login=Fa
                         success = True
                         sent_count += 1
                     else:
+                        # 送信テキスト（prefix/suffix 適用済み）をクリップボードにコピー
+                        # クリップボードはフォアグラウンドと無関係なので、アクティブ化と並行して行う
+                        clipboard = core.copy_to_clipboard_async(final_prompt)
+
+                        yield {"type": "progress", "step": "copy", "index": i, "total": total_prompts}
+
                         # ChatGPTウィンドウをアクティブ化
                         if not core.activate_chatgpt_window():
                             raise RunError("Failed to activate ChatGPT window")
                 
-                        yield {
-                            "type": "progress",
-                            "step": "activate",
-                            "index": i,
-                            "total": total_prompts
-                        }
+                        # activate_chatgpt_window() はフォアグラウンドの切り替わりを確認してから返るので、ここでは待たない
+                        yield {"type": "progress", "step": "activate", "index": i, "total": total_prompts}
 
-                        time.sleep(core.LONG_SLEEP)  # ウィンドウアクティブ化後の待機
+                        # コピーの完了を待ってから（失敗していればここで例外）
+                        # 入力エリアをクリック → 既存テキストをクリア → 貼り付け（1回の入力送信）
+                        clipboard.result(timeout=core.CLIPBOARD_TIMEOUT)
+                        core.paste_prompt()
 
-                        # 入力エリアをクリック
-                        pyautogui.click(core.input_x, core.input_y)
-                        time.sleep(core.SHORT_SLEEP)  # クリック後の待機
-                
                         yield {
-                            "type": "progress", 
+                            "type": "progress",
                             "step": "click",
-                            "index": i, 
+                            "index": i,
                             "total": total_prompts,
                             "x": core.input_x,
                             "y": core.input_y
                         }
-                
-                        # 既存テキストをクリア
-                        pyautogui.hotkey('ctrl', 'a')
-                        time.sleep(core.SHORT_SLEEP)  # Ctrl+A選択後の待機
-
-                        # プレフィックス・サフィックスを適用してクリップボードにコピー（行ごとの値を使用）
-                        final_prompt = f"{row_prefix}{prompt}{row_suffix}" if (row_prefix or row_suffix) else prompt
-                        pyperclip.copy(final_prompt)
-                        time.sleep(core.SHORT_SLEEP)  # クリップボードコピー後の待機
-                
-                        yield {
-                            "type": "progress", 
-                            "step": "copy",
-                            "index": i, 
-                            "total": total_prompts
-                        }
-                
-                        # クリップボードから貼り付け
-                        pyautogui.hotkey('ctrl', 'v')
-                        time.sleep(core.LONG_SLEEP)  # Ctrl+V貼り付け後の待機
+                        yield {"type": "progress", "step": "paste", "index": i, "total": total_prompts}
 
-                        yield {
-                            "type": "progress",
-                            "step": "paste",
-                            "index": i,
-                            "total": total_prompts
-                        }
+                        # Ctrl+V貼り付け後の待機（貼り付けの完了は外から検知できないため LONG_SLEEP を上限として待つ。
+                        # 待機中に緊急停止されたら、送信せずにその時点で中断）
+                        core._wait(core.LONG_SLEEP)
 
                         # Enterキーで送信
-                        pyautogui.press('enter')
+                        core.submit_prompt()
                         time.sleep(core.SHORT_SLEEP)  # Enter送信後の待機
-                
-                        yield {
-                            "type": "progress", 
-                            "step": "send",
-                            "index": i, 
-                            "total": total_prompts
-                        }
+
+                        yield {"type": "progress", "step": "send", "index": i, "total": total_prompts}
                         
                         success = True
                         sent_count += 1
@@ -710,6 +1029,8 @@ def iter_process_prompts(csv_path, wait=60, profile_dir=None, pause_for_login=Fa
                         }
                     # リトライの場合はcontinueで次のループへ
                     continue
+                except pyautogui.FailSafeException:
+                    raise  # マウスを画面の隅に移動した緊急停止はリトライせず、全体を中断する
                 except Exception as e:
                     if attempt >= max_attempts:
                         failed_count += 1
@@ -727,20 +1048,24 @@ def iter_process_prompts(csv_path, wait=60, profile_dir=None, pause_for_login=Fa
                     # リトライの場合はcontinueで次のループへ
                     continue
             
-            # 成功時の処理済みプロンプト更新（done=1）
+            # 成功時の処理済みプロンプト記録（done ログに追記し、CSVへは終了時にまとめて反映）
             if success and not dry_run:
-                success_csv, total_rows, _ = core.mark_prompt_as_done(csv_path, prompt)
-                if success_csv:
+                try:
+                    core.log_prompt_done(csv_path, row_number, prompt)
+                except OSError as e:
+                    if logger:
+                        logger.error(f"Failed to record done prompt: {e}")
+                else:
                     if logger:
-                        logger.info(f"Marked prompt as done in CSV")
+                        logger.info(f"Logged prompt as done (row {row_number})")
                     yield {
-                        "type": "csv_updated", 
-                        "marked_done": prompt[:30] + "..." if len(prompt) > 30 else prompt,
-                        "total_rows": total_rows
+                        "type": "done_logged",
+                        "marked_done": prompt if prompt_len <= 30 else f"{prompt[:30]}...",
+                        "row": row_number
                     }
                 
             # 最後のプロンプト以外は生成完了を待つ
-            if success and i < len(prompts) and not dry_run:
+            if success and i < total_prompts and not dry_run:
                 yield {"type": "phase", "name": "generation_wait"}
                 
                 # 元のウィンドウに戻す
@@ -751,8 +1076,7 @@ def iter_process_prompts(csv_path, wait=60, profile_dir=None, pause_for_login=Fa
                 while remaining > 0:
                     core._check_stop()
 
-                    mins = remaining // 60
-                    secs = remaining % 60
+                    mins, secs = divmod(remaining, 60)
 
                     yield {
                         "type": "wait",
@@ -763,8 +1087,9 @@ def iter_process_prompts(csv_path, wait=60, profile_dir=None, pause_for_login=Fa
                         "total": total_prompts
                     }
 
-                    time.sleep(min(10, remaining))  # 10秒または残り時間
-                    remaining -= min(10, remaining)
+                    step = 10 if remaining > 10 else remaining  # 10秒または残り時間
+                    core._wait(step)  # 停止されたら即座に中断
+                    remaining -= step
         
         # 最後のプロンプト処理後も生成完了を待機
         if sent_count > 0 and not dry_run:
@@ -775,8 +1100,7 @@ def iter_process_prompts(csv_path, wait=60, profile_dir=None, pause_for_login=Fa
             while remaining > 0:
                 core._check_stop()
 
-                mins = remaining // 60
-                secs = remaining % 60
+                mins, secs = divmod(remaining, 60)
 
                 yield {
                     "type": "wait",
@@ -786,8 +1110,9 @@ def iter_process_prompts(csv_path, wait=60, profile_dir=None, pause_for_login=Fa
                     "final": True
                 }
 
-                time.sleep(min(10, remaining))
-                remaining -= min(10, remaining)
+                step = 10 if remaining > 10 else remaining
+                core._wait(step)
+                remaining -= step
         
         # 最終結果
         result = {
@@ -814,6 +1139,12 @@ def iter_process_prompts(csv_path, wait=60, profile_dir=None, pause_for_login=Fa
         if isinstance(e, (InputError, RunError)):
             raise
         raise RunError(f"Unexpected error: {e}")
+    finally:
+        core.shutdown_clipboard()
+
+        # 処理済みの行をCSVへまとめて反映（停止・エラー時も、それまでに送信できた分を反映する）
+        if not dry_run:
+            core.apply_done_log(csv_path)
 
 
 # 後方互換性のための関数
@@ -825,8 +1156,15 @@ def process_prompts(csv_path, wait=60, profile_dir=None, pause_for_login=False,
         dict: {"total": int, "sent": int, "failed": int}
     """
     result = None
-    for event in iter_process_prompts(csv_path, wait, profile_dir, pause_for_login, logger=logger, dry_run=dry_run, max_items=max_items, retry=retry, prefix=prefix, suffix=suffix):
-        if event.get("type") == "result":
-            result = {k: v for k, v in event.items() if k != "type"}
+    events = iter_process_prompts(csv_path, wait, profile_dir, pause_for_login, logger=logger, dry_run=dry_run, max_items=max_items, retry=retry, prefix=prefix, suffix=suffix)
+    try:
+        for event in events:
+            if event.get("type") == "result":
+                # result は最後のイベントなので、ここで打ち切る（type を除いてそのまま返す）
+                result = event
+                result.pop("type", None)
+                break
+    finally:
+        events.close()  # 後処理（done ログのCSV反映など）を戻る前に確実に実行
 
     return result or {"total": 0, "sent": 0, "failed": 0}
\ No newline at end of file
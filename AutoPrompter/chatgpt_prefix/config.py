@@ -7,10 +7,20 @@ CLI > ENV > config ファイルの優先順位で設定をマージする
 """
 
 import os
-import yaml
-from pathlib import Path
-from typing import Dict, Any, Optional
-import argparse
+from collections import ChainMap
+from typing import Dict, Any, Mapping, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import argparse
+
+
+# 環境変数で True とみなす値
+_BOOL_TRUE_VALUES = frozenset(('true', '1', 'yes', 'on'))
+
+
+def _to_bool(value: str) -> bool:
+    """環境変数の文字列を bool に変換"""
+    return value.lower() in _BOOL_TRUE_VALUES
 
 
 class ChatGPTConfig:
@@ -37,24 +47,39 @@ class ChatGPTConfig:
         'use_csv_mode': False
     }
     
-    # 環境変数のマッピング
+    # 環境変数のマッピング（環境変数名 -> (設定キー, 型変換)）
     ENV_MAPPING = {
-        'CHATGPT_CSV': 'csv',
-        'CHATGPT_WAIT': 'wait',
-        'CHATGPT_PROFILE_DIR': 'profile_dir',
-        'CHATGPT_PAUSE_FOR_LOGIN': 'pause_for_login',
-        'CHATGPT_OUTPUT_MODE': 'output_mode',
-        'CHATGPT_INTERACTIVE': 'interactive',
-        'CHATGPT_QUIET': 'quiet',
-        'CHATGPT_LOG_FILE': 'log_file',
-        'CHATGPT_LOG_LEVEL': 'log_level',
-        'CHATGPT_DRY_RUN': 'dry_run',
-        'CHATGPT_MAX_ITEMS': 'max_items',
-        'CHATGPT_RETRY': 'retry',
-        'CHATGPT_PREFIX': 'prefix',
-        'CHATGPT_SUFFIX': 'suffix'
+        'CHATGPT_CSV': ('csv', str),
+        'CHATGPT_WAIT': ('wait', int),
+        'CHATGPT_PROFILE_DIR': ('profile_dir', str),
+        'CHATGPT_PAUSE_FOR_LOGIN': ('pause_for_login', _to_bool),
+        'CHATGPT_OUTPUT_MODE': ('output_mode', str),
+        'CHATGPT_INTERACTIVE': ('interactive', _to_bool),
+        'CHATGPT_QUIET': ('quiet', _to_bool),
+        'CHATGPT_LOG_FILE': ('log_file', str),
+        'CHATGPT_LOG_LEVEL': ('log_level', str),
+        'CHATGPT_DRY_RUN': ('dry_run', _to_bool),
+        'CHATGPT_MAX_ITEMS': ('max_items', int),
+        'CHATGPT_RETRY': ('retry', int),
+        'CHATGPT_PREFIX': ('prefix', str),
+        'CHATGPT_SUFFIX': ('suffix', str)
     }
     
+    # CLI引数のマッピング（属性名, 設定キー, 属性がない場合の値）
+    CLI_ATTRS = (
+        ('csv', 'csv', None),
+        ('wait', 'wait', None),
+        ('profile_dir', 'profile_dir', None),
+        ('pause_for_login', 'pause_for_login', None),
+        ('log_file', 'log_file', None),
+        ('log_level', 'log_level', None),
+        ('prefix', 'prefix', ''),
+        ('suffix', 'suffix', ''),
+        ('max_items', 'max_items', None),
+        ('short_sleep', 'short_sleep', None),
+        ('long_sleep', 'long_sleep', None)
+    )
+    
     def __init__(self, config_file: Optional[str] = None):
         self.config_file = config_file
         self._config = {}
@@ -64,104 +89,58 @@ class ChatGPTConfig:
         if not self.config_file:
             return {}
         
-        config_path = Path(self.config_file)
-        if not config_path.exists():
-            return {}
-        
-        try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f) or {}
-            
-            # YAML構造を平坦化 (chatgpt.csv -> csv)
-            config = {}
-            if 'chatgpt' in data:
-                config.update(data['chatgpt'])
-            if 'output' in data:
-                for key, value in data['output'].items():
-                    if key == 'mode':
-                        config['output_mode'] = value
-                    else:
-                        config[key] = value
-            if 'logging' in data:
-                for key, value in data['logging'].items():
-                    config[key] = value
-            if 'safety' in data:
-                for key, value in data['safety'].items():
-                    config[key] = value
-            
-            return config
-            
-        except Exception:
+        config_path = str(self.config_file)
+        if not os.path.exists(config_path):
             return {}
+
+        return _load_config(config_path)
     
     def load_env_vars(self) -> Dict[str, Any]:
         """環境変数を読み込み"""
         env_config = {}
         
-        for env_key, config_key in self.ENV_MAPPING.items():
+        for env_key, (config_key, convert) in self.ENV_MAPPING.items():
             value = os.getenv(env_key)
             if value is not None:
-                # 型変換
-                if config_key in ['wait', 'max_items', 'retry']:
-                    try:
-                        env_config[config_key] = int(value)
-                    except ValueError:
-                        continue
-                elif config_key in ['pause_for_login', 'interactive', 'quiet', 'dry_run']:
-                    env_config[config_key] = value.lower() in ('true', '1', 'yes', 'on')
-                else:
-                    env_config[config_key] = value
+                # 型変換（数値に変換できない値は無視）
+                try:
+                    env_config[config_key] = convert(value)
+                except ValueError:
+                    continue
         
         return env_config
     
-    def merge_configs(self, cli_args: argparse.Namespace) -> Dict[str, Any]:
-        """CLI > ENV > config の優先順位で設定をマージ"""
-        
-        # 1. デフォルト値から開始
-        merged = self.DEFAULTS.copy()
+    def merge_configs(self, cli_args: 'argparse.Namespace') -> Mapping[str, Any]:
+        """CLI > ENV > config の優先順位で設定をマージ
+
+        各層の辞書はコピーせず ChainMap で重ね、参照時に優先順位の高い層から探す
+        """
         
-        # 2. 設定ファイルの値で上書き
+        # 1. デフォルト値（self.DEFAULTS をコピーせず最下層に置く）
+        # 2. 設定ファイルの値
         file_config = self.load_config_file()
-        merged.update(file_config)
         
-        # 3. 環境変数で上書き
+        # 3. 環境変数
         env_config = self.load_env_vars()
-        merged.update(env_config)
         
-        # 4. CLI引数で最終上書き（None以外の値のみ）
+        # 4. CLI引数（None以外の値のみ、最も優先順位が高い層）
         cli_config = {}
         
-        # CLI引数のマッピング（明示的に指定された値のみ）
-        cli_mapping = {
-            'csv': cli_args.csv,
-            'wait': cli_args.wait,
-            'profile_dir': getattr(cli_args, 'profile_dir', None),
-            'pause_for_login': getattr(cli_args, 'pause_for_login', None),
-            'log_file': getattr(cli_args, 'log_file', None),
-            'log_level': getattr(cli_args, 'log_level', None),
-            'prefix': getattr(cli_args, 'prefix', ''),
-            'suffix': getattr(cli_args, 'suffix', '')
-        }
+        # CLI引数のマッピング（明示的に指定された値 = None以外の値のみ採用）
+        for attr, key, default in self.CLI_ATTRS:
+            value = getattr(cli_args, attr, default)
+            if value is not None:
+                cli_config[key] = value
 
         # boolean引数は明示的に指定された場合のみ上書き
         if getattr(cli_args, 'dry_run', False):
-            cli_mapping['dry_run'] = True
+            cli_config['dry_run'] = True
 
         if getattr(cli_args, 'csv_mode', False):
-            cli_mapping['use_csv_mode'] = True
-
-        # 数値引数も明示的にチェック
-        if hasattr(cli_args, 'max_items') and cli_args.max_items is not None:
-            cli_mapping['max_items'] = cli_args.max_items
+            cli_config['use_csv_mode'] = True
 
-        if hasattr(cli_args, 'retry') and cli_args.retry != 0:  # デフォルト以外の値
-            cli_mapping['retry'] = cli_args.retry
-
-        if hasattr(cli_args, 'short_sleep') and cli_args.short_sleep is not None:
-            cli_mapping['short_sleep'] = cli_args.short_sleep
-
-        if hasattr(cli_args, 'long_sleep') and cli_args.long_sleep is not None:
-            cli_mapping['long_sleep'] = cli_args.long_sleep
+        if getattr(cli_args, 'retry', 0) != 0:  # デフォルト以外の値
+            cli_config['retry'] = cli_args.retry
         
         # 出力モード判定
         if getattr(cli_args, 'json', False):
@@ -177,12 +156,7 @@ class ChatGPTConfig:
         if getattr(cli_args, 'interactive', False):
             cli_config['interactive'] = True
         
-        # None以外の値のみ採用
-        for key, value in cli_mapping.items():
-            if value is not None:
-                cli_config[key] = value
-        
-        merged.update(cli_config)
+        merged = ChainMap(cli_config, env_config, file_config, self.DEFAULTS)
         
         # 結果を保存
         self._config = merged
@@ -200,10 +174,50 @@ class ChatGPTConfig:
     
     def to_dict(self) -> Dict[str, Any]:
         """設定を辞書として取得"""
-        return self._config.copy()
+        return dict(self._config)
+
+
+# 設定ファイルのセクション -> キー名の変換（None はキー名をそのまま使う）
+# 後のセクションほど優先（同じキーは上書き）
+_SECTION_MAP = {
+    'chatgpt': None,
+    'output': {'mode': 'output_mode'},
+    'logging': None,
+    'safety': None
+}
+
+
+def _load_config(path: str) -> Dict[str, Any]:
+    """設定ファイルを解析して平坦化した辞書を返す（呼び出しごとに新しい辞書）"""
+    try:
+        # yaml は設定ファイル指定時のみ必要なため、ここで読み込む
+        import yaml
+
+        # libyaml があれば C 実装のローダーを使う（safe_load と同じ安全な読み込み）
+        loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+        with open(path, 'r', encoding='utf-8') as f:
+            data = yaml.load(f, Loader=loader) or {}
+        
+        # YAML構造を平坦化 (chatgpt.csv -> csv)
+        config = {}
+        for section, rename in _SECTION_MAP.items():
+            values = data.get(section)
+            if values is None:
+                continue
+            if rename is None:
+                config.update(values)
+            else:
+                for key, value in values.items():
+                    config[rename.get(key, key)] = value
+        
+        return config
+        
+    except Exception:
+        return {}
 
 
-def create_config(config_file: Optional[str] = None, cli_args: Optional[argparse.Namespace] = None) -> ChatGPTConfig:
+def create_config(config_file: Optional[str] = None, cli_args: Optional['argparse.Namespace'] = None) -> ChatGPTConfig:
     """設定オブジェクトを作成"""
     config = ChatGPTConfig(config_file)
     if cli_args:
@@ -5,14 +5,59 @@ Event Handler - Clean Version
 Processes NDJSON events and updates GUI accordingly
 """
 
+import re
 from typing import Dict, Any, Optional
 import tkinter as tk
 from .main_window import ChatGPTGUIWindow
 
 
+# Separator line for interactive-mode section headers
+_SEP = "=" * 50
+
+# Errors caused by characters that cp932 cannot encode
+_UNICODE_ERROR_PATTERN = re.compile(r"UnicodeEncodeError|特殊文字")
+
+
 class EventHandler:
     """NDJSON event processing class"""
     
+    # Phase name mappings
+    PHASE_NAMES = {
+        "coordinate_setup": "Coordinate Setup",
+        "window_search": "Window Search", 
+        "processing_prep": "Processing Prep",
+        "processing": "Prompt Processing",
+        "generation_wait": "Generation Wait",
+        "final_wait": "Final Wait"
+    }
+    
+    # Step name mappings
+    STEP_NAMES = {
+        "start": "Start",
+        "activate": "Activate",
+        "click": "Click",
+        "copy": "Copy",
+        "paste": "Paste", 
+        "send": "Send",
+        "simulate": "Simulate"
+    }
+    
+    # Interactive-mode log lines for steps that carry no event data
+    INTERACTIVE_STEP_MESSAGES = {
+        "activate": ("🎯 Soraウィンドウをアクティブ化", "info"),
+        "copy": ("📋 クリップボードにコピー", "info"),
+        "paste": ("📝 プロンプトを貼り付け", "info"),
+        "send": ("🚀 プロンプトを送信", "info")
+    }
+    
+    # Raw output level -> log tag
+    RAW_OUTPUT_TAGS = {
+        "info": "info",
+        "warning": "warning", 
+        "error": "error",
+        "debug": "debug"
+    }
+    
     def __init__(self, gui_window: ChatGPTGUIWindow):
         self.gui = gui_window
         self.current_total = 0
@@ -20,25 +65,23 @@ class EventHandler:
         self.is_interactive = False
         self.is_dry_run = False
         
-        # Phase name mappings
-        self.phase_names = {
-            "coordinate_setup": "Coordinate Setup",
-            "window_search": "Window Search", 
-            "processing_prep": "Processing Prep",
-            "processing": "Prompt Processing",
-            "generation_wait": "Generation Wait",
-            "final_wait": "Final Wait"
-        }
+        # Progress log formatter for the current mode (rebound when settings change)
+        self._log_progress = self._log_progress_plain
         
-        # Step name mappings
-        self.step_names = {
-            "start": "Start",
-            "activate": "Activate",
-            "click": "Click",
-            "copy": "Copy",
-            "paste": "Paste", 
-            "send": "Send",
-            "simulate": "Simulate"
+        # Event type -> handler (one dict lookup per event instead of an if/elif chain)
+        self._dispatch = {
+            "loaded": self._handle_loaded,
+            "phase": self._handle_phase,
+            "window_found": self._handle_window_found,
+            "coordinate": self._handle_coordinate,
+            "countdown": self._handle_countdown,
+            "progress": self._handle_progress,
+            "retry": self._handle_retry,
+            "wait": self._handle_wait,
+            "done_logged": self._handle_done_logged,
+            "result": self._handle_result,
+            "error": self._handle_error,
+            "raw_output": self._handle_raw_output
         }
     
     def handle_event(self, event: Dict[str, Any]):
@@ -50,32 +93,12 @@ class EventHandler:
             settings = event['_settings']
             self.is_interactive = settings.get('interactive', False)
             self.is_dry_run = settings.get('dry_run', False)
+            self._log_progress = self._log_progress_interactive if self.is_interactive else self._log_progress_plain
         
         # Event type handling
-        if event_type == "loaded":
-            self._handle_loaded(event)
-        elif event_type == "phase":
-            self._handle_phase(event)
-        elif event_type == "window_found":
-            self._handle_window_found(event)
-        elif event_type == "coordinate":
-            self._handle_coordinate(event)
-        elif event_type == "countdown":
-            self._handle_countdown(event)
-        elif event_type == "progress":
-            self._handle_progress(event)
-        elif event_type == "retry":
-            self._handle_retry(event)
-        elif event_type == "wait":
-            self._handle_wait(event)
-        elif event_type == "csv_updated":
-            self._handle_csv_updated(event)
-        elif event_type == "result":
-            self._handle_result(event)
-        elif event_type == "error":
-            self._handle_error(event)
-        elif event_type == "raw_output":
-            self._handle_raw_output(event)
+        handler = self._dispatch.get(event_type)
+        if handler is not None:
+            handler(event)
         else:
             # Unknown event type
             self.gui.add_log(f"Unknown event: {event}", "debug")
@@ -90,38 +113,44 @@ class EventHandler:
         self.current_total = total
         
         if self.is_interactive:
-            self.gui.add_log(f"📊 プロンプト読み込み完了: {total}個", "info")
-            self.gui.add_log(f"📄 CSVファイル: {csv_path}", "info")
+            entries = [
+                (f"📊 プロンプト読み込み完了: {total}個", "info"),
+                (f"📄 CSVファイル: {csv_path}", "info")
+            ]
             if dry_run:
-                self.gui.add_log("🔍 [DRY-RUN MODE] シミュレーション実行", "warning")
+                entries.append(("🔍 [DRY-RUN MODE] シミュレーション実行", "warning"))
             if max_items:
-                self.gui.add_log(f"📋 処理制限: {max_items}件まで", "info")
+                entries.append((f"📋 処理制限: {max_items}件まで", "info"))
         else:
             message = f"Loaded {total} prompts from {csv_path}"
             if dry_run:
                 message += " [DRY-RUN MODE]"
             if max_items:
                 message += f" (limited to {max_items} items)"
-            self.gui.add_log(message, "info")
+            entries = [(message, "info")]
         
-        self.gui.update_status(f"Loaded {total} prompts")
+        self.gui.update_status_and_log(f"Loaded {total} prompts", entries)
     
     def _handle_phase(self, event: Dict[str, Any]):
         """Phase change"""
         phase = event.get("name", "unknown")
-        phase_name = self.phase_names.get(phase, phase)
+        phase_name = self.PHASE_NAMES.get(phase, phase)
         
         # Interactive mode shows more detailed phase information
         if self.is_interactive:
-            self.gui.add_log("", "info")  # Empty line for spacing
-            self.gui.add_log(f"{'='*50}", "info")
-            self.gui.add_log(f"フェーズ: {phase_name}", "info")
-            self.gui.add_log(f"{'='*50}", "info")
+            entries = (
+                ("", "info"),  # Empty line for spacing
+                (_SEP, "info"),
+                (f"フェーズ: {phase_name}", "info"),
+                (_SEP, "info")
+            )
         else:
-            self.gui.add_log("", "info")  # Empty line for spacing
-            self.gui.add_log(f"Phase: {phase_name}", "info")
+            entries = (
+                ("", "info"),  # Empty line for spacing
+                (f"Phase: {phase_name}", "info")
+            )
         
-        self.gui.update_status(f"Phase: {phase_name}")
+        self.gui.update_status_and_log(f"Phase: {phase_name}", entries)
     
     def _handle_window_found(self, event: Dict[str, Any]):
         """Window found"""
@@ -168,39 +197,43 @@ class EventHandler:
         phase = event.get("phase", "")
         message = event.get("message", "")
         
-        phase_name = self.phase_names.get(phase, phase)
+        phase_name = self.PHASE_NAMES.get(phase, phase)
         status = f"{phase_name}: {seconds_left}s - {message}"
         
-        # Update status
-        self.gui.update_status(status)
-        
-        # Add countdown to log
+        # Add countdown to log (status and log lines are updated together)
         if self.is_interactive:
             # Interactive mode: detailed guidance
             if phase == "coordinate_setup" and seconds_left == 5:
-                self.gui.add_log("📍 Soraの入力欄にマウスカーソルを置いてください", "info")
-                self.gui.add_log("⏰ 5秒後に自動で座標を記録します", "info")
-                self.gui.add_log("🚨 緊急停止: マウスを画面左上角に移動", "warning")
+                entries = [
+                    ("📍 Soraの入力欄にマウスカーソルを置いてください", "info"),
+                    ("⏰ 5秒後に自動で座標を記録します", "info"),
+                    ("🚨 緊急停止: マウスを画面左上角に移動", "warning")
+                ]
             elif phase == "processing_prep" and seconds_left == 5:
-                self.gui.add_log("🚀 準備完了！", "info")
-                self.gui.add_log("📊 処理対象: プロンプト", "info")
-                self.gui.add_log("⏰ 5秒後に自動処理を開始します...", "info")
-                self.gui.add_log("🚨 緊急停止: Ctrl+C または マウスを左上角に移動", "warning")
+                entries = [
+                    ("🚀 準備完了！", "info"),
+                    ("📊 処理対象: プロンプト", "info"),
+                    ("⏰ 5秒後に自動処理を開始します...", "info"),
+                    ("🚨 緊急停止: Ctrl+C または マウスを左上角に移動", "warning")
+                ]
+            else:
+                entries = []
 
-            self.gui.add_log(f"⏳ {seconds_left}秒...", "info")
+            entries.append((f"⏳ {seconds_left}秒...", "info"))
+            self.gui.update_status_and_log(status, entries)
         else:
             # Non-interactive mode: simple countdown
             if seconds_left <= 5:
                 log_message = f"準備中... ({message}) - {seconds_left}秒"
-                self.gui.add_log(log_message, "info")
+                self.gui.update_status_and_log(status, ((log_message, "info"),))
+            else:
+                self.gui.update_status(status)
     
     def _handle_progress(self, event: Dict[str, Any]):
         """Progress update"""
         step = event.get("step", "")
         index = event.get("index", 0)
         total = event.get("total", 0)
-        prompt = event.get("prompt", "")
-        dry_run = event.get("dry_run", False)
         
         self.current_index = index
         if total > 0:
@@ -210,44 +243,43 @@ class EventHandler:
         self.gui.update_progress(index, total)
         
         # Create log message
-        step_name = self.step_names.get(step, step)
-        
-        if self.is_interactive:
-            # Interactive mode: detailed step-by-step logging like CLI
-            if step == "start":
-                self.gui.add_log("", "info")  # Empty line for spacing
-                if dry_run:
-                    self.gui.add_log(f"--- 🔍 [DRY-RUN] Processing prompt {index}/{total} ---", "debug")
-                else:
-                    self.gui.add_log(f"--- 📝 Processing prompt {index}/{total} ---", "info")
-                self.gui.add_log(f"📄 Prompt: {prompt}", "info")
-            elif step == "activate":
-                self.gui.add_log("🎯 Soraウィンドウをアクティブ化", "info")
-            elif step == "click":
-                x = event.get('x', 0)
-                y = event.get('y', 0)
-                self.gui.add_log(f"🖱️ 入力エリアをクリック: ({x}, {y})", "info")
-            elif step == "copy":
-                self.gui.add_log("📋 クリップボードにコピー", "info")
-            elif step == "paste":
-                self.gui.add_log("📝 プロンプトを貼り付け", "info")
-            elif step == "send":
-                self.gui.add_log("🚀 プロンプトを送信", "info")
-            elif step == "simulate":
-                self.gui.add_log(f"🔍 [DRY-RUN] [{index}/{total}] プロンプト処理をシミュレーション", "debug")
-        else:
-            # Non-interactive mode: simple logging
-            if step == "start":
-                message = f"[{index}/{total}] Starting: {prompt}"
-                if dry_run:
-                    message = f"[DRY-RUN] [{index}/{total}] Starting: {prompt}"
-            elif step == "simulate":
-                message = f"[DRY-RUN] [{index}/{total}] Simulating prompt processing"
+        self._log_progress(event, step, index, total)
+    
+    def _log_progress_interactive(self, event: Dict[str, Any], step: str, index: int, total: int):
+        """Interactive mode: detailed step-by-step logging like CLI"""
+        fixed_message = self.INTERACTIVE_STEP_MESSAGES.get(step)
+        if fixed_message is not None:
+            self.gui.add_log(*fixed_message)
+        elif step == "start":
+            self.gui.add_log("", "info")  # Empty line for spacing
+            if event.get("dry_run", False):
+                self.gui.add_log(f"--- 🔍 [DRY-RUN] Processing prompt {index}/{total} ---", "debug")
             else:
-                message = f"[{index}/{total}] {step_name}"
-            
-            tag = "info" if not dry_run else "debug"
-            self.gui.add_log(message, tag)
+                self.gui.add_log(f"--- 📝 Processing prompt {index}/{total} ---", "info")
+            self.gui.add_log(f"📄 Prompt: {event.get('prompt', '')}", "info")
+        elif step == "click":
+            x = event.get('x', 0)
+            y = event.get('y', 0)
+            self.gui.add_log(f"🖱️ 入力エリアをクリック: ({x}, {y})", "info")
+        elif step == "simulate":
+            self.gui.add_log(f"🔍 [DRY-RUN] [{index}/{total}] プロンプト処理をシミュレーション", "debug")
+    
+    def _log_progress_plain(self, event: Dict[str, Any], step: str, index: int, total: int):
+        """Non-interactive mode: simple logging"""
+        dry_run = event.get("dry_run", False)
+        if step == "start":
+            prompt = event.get("prompt", "")
+            if dry_run:
+                message = f"[DRY-RUN] [{index}/{total}] Starting: {prompt}"
+            else:
+                message = f"[{index}/{total}] Starting: {prompt}"
+        elif step == "simulate":
+            message = f"[DRY-RUN] [{index}/{total}] Simulating prompt processing"
+        else:
+            message = f"[{index}/{total}] {self.STEP_NAMES.get(step, step)}"
+        
+        tag = "info" if not dry_run else "debug"
+        self.gui.add_log(message, tag)
     
     def _handle_retry(self, event: Dict[str, Any]):
         """Retry information"""
@@ -270,25 +302,26 @@ class EventHandler:
         
         if final:
             status = f"Final wait: {minutes}m {seconds}s remaining"
-            log_message = f"⏱️ 最終生成完了まで待機中: {minutes:02d}:{seconds:02d}"
         else:
             status = f"Wait for generation [{next_index}/{total}]: {minutes}m {seconds}s remaining"
-            log_message = f"⏱️ 残り時間: {minutes:02d}:{seconds:02d} | 次: {next_index}/{total}"
         
-        # Update status
-        self.gui.update_status(status)
-        
-        # Add wait info to log (show every 10 seconds to avoid spam)
+        # Add wait info to log (show every 10 seconds to avoid spam; only format when it is logged)
         if seconds % 10 == 0 or seconds <= 5:
-            self.gui.add_log(log_message, "info")
+            if final:
+                log_message = f"⏱️ 最終生成完了まで待機中: {minutes:02d}:{seconds:02d}"
+            else:
+                log_message = f"⏱️ 残り時間: {minutes:02d}:{seconds:02d} | 次: {next_index}/{total}"
+            self.gui.update_status_and_log(status, ((log_message, "info"),))
+        else:
+            # Update status
+            self.gui.update_status(status)
     
-    def _handle_csv_updated(self, event: Dict[str, Any]):
-        """CSV updated"""
-        removed = event.get("removed", "")
-        old_count = event.get("old_count", 0)
-        new_count = event.get("new_count", 0)
+    def _handle_done_logged(self, event: Dict[str, Any]):
+        """Prompt recorded as done (written to the CSV when the run ends)"""
+        row = event.get("row")
+        marked_done = event.get("marked_done", "")
         
-        message = f"CSV updated: {old_count} -> {new_count} rows (removed: {removed})"
+        message = f"Prompt logged as done (row {row}): {marked_done}"
         self.gui.add_log(message, "info")
     
     def _handle_result(self, event: Dict[str, Any]):
@@ -300,9 +333,9 @@ class EventHandler:
         if self.is_interactive:
             # Interactive mode: detailed completion report like CLI
             self.gui.add_log("", "info")  # Empty line for spacing
-            self.gui.add_log(f"{'='*50}", "info")
+            self.gui.add_log(_SEP, "info")
             self.gui.add_log("🎉 処理完了!", "success")
-            self.gui.add_log(f"{'='*50}", "info")
+            self.gui.add_log(_SEP, "info")
             self.gui.add_log(f"📊 処理対象: {total}個", "info")
             self.gui.add_log(f"✅ 成功: {sent}個", "success")
             self.gui.add_log(f"❌ 失敗: {failed}個", "error" if failed > 0 else "info")
@@ -311,7 +344,7 @@ class EventHandler:
                 success_rate = (sent / total) * 100
                 self.gui.add_log(f"📈 成功率: {success_rate:.1f}%", "info")
             
-            self.gui.add_log(f"{'='*50}", "info")
+            self.gui.add_log(_SEP, "info")
         else:
             # Non-interactive mode: simple result
             self.gui.add_log("", "info")  # Empty line for spacing
@@ -342,16 +375,17 @@ class EventHandler:
 
         # Build error message
         if index and total:
-            message = f"[{index}/{total}] Error in {step}: {error}"
             if attempts and max_retry:
-                message += f" (attempt {attempts}/{max_retry + 1})"
+                message = f"[{index}/{total}] Error in {step}: {error} (attempt {attempts}/{max_retry + 1})"
+            else:
+                message = f"[{index}/{total}] Error in {step}: {error}"
         else:
             message = f"Error in {step}: {error}"
 
         self.gui.add_log(message, "error")
 
         # 特殊文字エラーの場合は追加の説明を表示
-        if "UnicodeEncodeError" in error_type or "UnicodeEncodeError" in str(error) or "特殊文字" in str(error):
+        if _UNICODE_ERROR_PATTERN.search(error_type) or _UNICODE_ERROR_PATTERN.search(str(error)):
             self.gui.add_log("⚠️  CSVファイル内にcp932でエンコードできない特殊文字（é、à、ñなど）が含まれています", "warning")
             self.gui.add_log("💡 解決方法: CSVファイル内の特殊文字を通常のASCII文字に変更してください", "info")
             detail = event.get("detail", "")
@@ -365,12 +399,6 @@ class EventHandler:
         
         if message:
             # Select tag based on level
-            tag_mapping = {
-                "info": "info",
-                "warning": "warning", 
-                "error": "error",
-                "debug": "debug"
-            }
-            tag = tag_mapping.get(level, "info")
+            tag = self.RAW_OUTPUT_TAGS.get(level, "info")
             
             self.gui.add_log(f"Raw: {message}", tag)
\ No newline at end of file
@@ -7,14 +7,50 @@ Simple tkinter-based GUI without encoding issues
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
+import collections
 import os
-from pathlib import Path
-from typing import Optional, Callable
+import time
+from typing import Optional, Callable, Iterable, Tuple
 
 
 class ChatGPTGUIWindow:
     """Main GUI Window"""
     
+    # Buffered log lines are written to the log widget every LOG_FLUSH_MS (ms) by a Tk-thread pump
+    LOG_FLUSH_MS = 50
+    
+    # Maximum number of lines kept in the log widget (older lines are trimmed)
+    LOG_MAX_LINES = 2000
+    
+    # Progress bar/status are redrawn at most this often (seconds)
+    PROGRESS_MIN_INTERVAL = 0.1
+    
+    # 操作速度 -> (SHORT_SLEEP, LONG_SLEEP)
+    SPEED_MAP = {
+        '高速': (0.2, 0.5),
+        '中速': (0.3, 1.0),
+        '低速': (0.5, 1.5)
+    }
+    
+    # 操作速度 -> speed description label text
+    SPEED_DESCRIPTIONS = {
+        '高速': '短: 0.2秒 / 長: 0.5秒',
+        '中速': '短: 0.3秒 / 長: 1.0秒',
+        '低速': '短: 0.5秒 / 長: 1.5秒'
+    }
+    
+    # Prefix/Suffix Text widget options per mode
+    CSV_MODE_TEXT_CONFIG = {'state': 'disabled', 'bg': '#f0f0f0'}
+    GUI_MODE_TEXT_CONFIG = {'state': 'normal', 'bg': 'white'}
+    
+    # Log tag -> item foreground ("info" uses the Listbox default, black)
+    LOG_TAG_COLORS = {
+        "success": "green",
+        "error": "red",
+        "warning": "orange",
+        "debug": "gray"
+    }
+    
     def __init__(self, root: Optional[tk.Tk] = None):
         if root is None:
             self.root = tk.Tk()
@@ -33,11 +69,11 @@ class ChatGPTGUIWindow:
         
         # Variables
         self.csv_var = tk.StringVar()
-        self.wait_var = tk.StringVar(value="120") # Increased from 60 to 120
+        self.wait_var = tk.IntVar(value=120) # Increased from 60 to 120
         self.dry_run_var = tk.BooleanVar(value=False)
         self.interactive_var = tk.BooleanVar(value=True)
-        self.max_items_var = tk.StringVar(value="50")
-        self.retry_var = tk.StringVar(value="0")
+        self.max_items_var = tk.IntVar(value=50)
+        self.retry_var = tk.IntVar(value=0)
         self.prefix_var = tk.StringVar(value="")
         self.suffix_var = tk.StringVar(value="")
         self.speed_var = tk.StringVar(value="高速")  # 操作速度設定
@@ -45,6 +81,22 @@ class ChatGPTGUIWindow:
         self.progress_var = tk.DoubleVar()
         self.status_var = tk.StringVar(value="Ready")
         
+        # Last values pushed to Tk (repeated updates with the same value are skipped)
+        self._status_text = "Ready"
+        self._progress_value = 0.0
+        self._last_progress_t = 0.0
+        
+        # Log lines waiting to be written to the log widget by _flush_log
+        # (deque append/popleft are atomic, so add_log may be called from worker threads)
+        self._log_buffer = collections.deque()
+        
+        # The log pane is built on the first flush (see _ensure_log_widgets)
+        self._log_built = False
+        
+        # Log timestamp cache (the "%H:%M:%S" string is rebuilt only when the second changes)
+        self._last_sec = -1
+        self._last_ts = ""
+        
         # Callbacks
         self.on_start_callback: Optional[Callable] = None
         self.on_stop_callback: Optional[Callable] = None
@@ -53,6 +105,9 @@ class ChatGPTGUIWindow:
         self.create_widgets()
         self.setup_layout()
         
+        # Start the log pump on the Tk thread; worker threads never call into Tk for logging
+        self.root.after(self.LOG_FLUSH_MS, self._flush_log)
+        
     def create_widgets(self):
         """Create GUI widgets"""
         # CSV File frame - 1行目
@@ -69,7 +124,7 @@ class ChatGPTGUIWindow:
         # Settings 1行目
         self.settings_row1 = ttk.Frame(self.settings_frame)
         ttk.Label(self.settings_row1, text="Wait:").pack(side="left", padx=(0,3))
-        self.wait_entry = ttk.Entry(self.settings_row1, textvariable=self.wait_var, width=5)
+        self.wait_entry = ttk.Spinbox(self.settings_row1, textvariable=self.wait_var, from_=0, to=9999, width=5)
         self.wait_entry.pack(side="left", padx=(0,12))
 
         self.dry_run_check = ttk.Checkbutton(self.settings_row1, text="Dry Run", variable=self.dry_run_var)
@@ -79,20 +134,20 @@ class ChatGPTGUIWindow:
         self.interactive_check.pack(side="left", padx=(0,12))
 
         ttk.Label(self.settings_row1, text="Max Items:").pack(side="left", padx=(0,3))
-        self.max_items_entry = ttk.Entry(self.settings_row1, textvariable=self.max_items_var, width=5)
+        self.max_items_entry = ttk.Spinbox(self.settings_row1, textvariable=self.max_items_var, from_=0, to=9999, width=5)
         self.max_items_entry.pack(side="left")
 
         # Settings 2行目
         self.settings_row2 = ttk.Frame(self.settings_frame)
         ttk.Label(self.settings_row2, text="Retry:").pack(side="left", padx=(0,3))
-        self.retry_entry = ttk.Entry(self.settings_row2, textvariable=self.retry_var, width=5)
+        self.retry_entry = ttk.Spinbox(self.settings_row2, textvariable=self.retry_var, from_=0, to=9999, width=5)
         self.retry_entry.pack(side="left", padx=(0,12))
 
         ttk.Label(self.settings_row2, text="Speed:").pack(side="left", padx=(0,3))
-        self.speed_combo = ttk.Combobox(self.settings_row2, textvariable=self.speed_var, width=6, state="readonly")
-        self.speed_combo['values'] = ('高速', '中速', '低速')
-        self.speed_combo.pack(side="left", padx=(0,12))
-        self.speed_combo.bind('<<ComboboxSelected>>', self.update_speed_description)
+        self.speed_menu = ttk.OptionMenu(self.settings_row2, self.speed_var, self.speed_var.get(), *self.SPEED_MAP,
+                                         command=self.update_speed_description)
+        self.speed_menu.configure(width=6)
+        self.speed_menu.pack(side="left", padx=(0,12))
 
         ttk.Label(self.settings_row2, text="Mode:").pack(side="left", padx=(0,5))
         self.gui_mode_radio = ttk.Radiobutton(self.settings_row2, text="GUI", variable=self.mode_var, value="gui", command=self.on_mode_changed)
@@ -138,18 +193,7 @@ class ChatGPTGUIWindow:
         self.status_row = ttk.Frame(self.control_frame)
         self.status_label = ttk.Label(self.status_row, textvariable=self.status_var, width=60)
 
-        # Log frame - ログ行数を15行に調整
-        self.log_frame = ttk.LabelFrame(self.root, text="Log", padding="5")
-        self.log_text = tk.Text(self.log_frame, height=15, width=55, font=("Consolas", 8))
-        self.log_scrollbar = ttk.Scrollbar(self.log_frame, orient="vertical", command=self.log_text.yview)
-        self.log_text.configure(yscrollcommand=self.log_scrollbar.set)
-        
-        # Log tags for coloring
-        self.log_text.tag_configure("info", foreground="black")
-        self.log_text.tag_configure("success", foreground="green")
-        self.log_text.tag_configure("error", foreground="red")
-        self.log_text.tag_configure("warning", foreground="orange")
-        self.log_text.tag_configure("debug", foreground="gray")
+        # Log frame is created later by _ensure_log_widgets so the window can paint first
         
     def setup_layout(self):
         """Setup layout"""
@@ -174,11 +218,39 @@ class ChatGPTGUIWindow:
         self.progress_bar.pack(fill="x", expand=True)
         self.status_row.pack(fill="x")
         self.status_label.pack(fill="x", expand=True)
-
-        # Log - 8行目
+        
+        self._freeze_layout()
+    
+    def _freeze_layout(self):
+        """Fix the heights of the top rows so later child changes don't trigger a window-wide geometry pass
+        
+        Only the log pane (packed last with expand=True) keeps resizing with the window.
+        """
+        self.root.update_idletasks()
+        for frame in (self.csv_frame, self.settings_frame, self.prefix_suffix_frame, self.control_frame):
+            frame.configure(height=frame.winfo_reqheight())
+            frame.pack_propagate(False)
+    
+    def _ensure_log_widgets(self):
+        """Create and pack the log pane on first use (it is the last row, so packing it late keeps the layout)"""
+        if self._log_built:
+            return
+        self._log_built = True
+        
+        # Log frame - ログ行数を15行に調整
+        # (Listbox: one item per line, appends don't re-layout the existing lines like Text does)
+        self.log_frame = ttk.LabelFrame(self.root, text="Log", padding="5")
+        self.log_listbox = tk.Listbox(self.log_frame, height=15, width=55, font=("Consolas", 8),
+                                      foreground="black", activestyle="none")
+        self.log_scrollbar = ttk.Scrollbar(self.log_frame, orient="vertical", command=self.log_listbox.yview)
+        self.log_xscrollbar = ttk.Scrollbar(self.log_frame, orient="horizontal", command=self.log_listbox.xview)
+        self.log_listbox.configure(yscrollcommand=self.log_scrollbar.set, xscrollcommand=self.log_xscrollbar.set)
+        
+        # Log - 8行目 (lines are not wrapped, so long ones scroll horizontally)
         self.log_frame.pack(fill="both", expand=True, padx=3, pady=3)
-        self.log_text.pack(side="left", fill="both", expand=True)
+        self.log_xscrollbar.pack(side="bottom", fill="x")
         self.log_scrollbar.pack(side="right", fill="y")
+        self.log_listbox.pack(side="left", fill="both", expand=True)
     
     def browse_csv(self):
         """Browse for CSV file"""
@@ -193,65 +265,64 @@ class ChatGPTGUIWindow:
 
     def update_speed_description(self, event=None):
         """Update speed description label when speed selection changes"""
-        speed_map = {
-            '高速': '短: 0.2秒 / 長: 0.5秒',
-            '中速': '短: 0.3秒 / 長: 1.0秒',
-            '低速': '短: 0.5秒 / 長: 1.5秒'
-        }
-        description = speed_map.get(self.speed_var.get(), '短: 0.2秒 / 長: 0.5秒')
+        description = self.SPEED_DESCRIPTIONS.get(self.speed_var.get(), self.SPEED_DESCRIPTIONS['高速'])
         self.speed_desc_label.config(text=description)
 
     def on_mode_changed(self):
         """Handle mode change (CSV/GUI mode)"""
         is_csv_mode = self.mode_var.get() == "csv"
 
-        if is_csv_mode:
-            # CSV Mode: Prefix/Suffix を無効化（グレーアウト）
-            self.prefix_text.config(state="disabled", bg="#f0f0f0")
-            self.suffix_text.config(state="disabled", bg="#f0f0f0")
-            self.prefix_frame.config(text="Prefix (disabled in CSV Mode)")
-            self.suffix_frame.config(text="Suffix (disabled in CSV Mode)")
-        else:
-            # GUI Mode: Prefix/Suffix を有効化
-            self.prefix_text.config(state="normal", bg="white")
-            self.suffix_text.config(state="normal", bg="white")
-            self.prefix_frame.config(text="Prefix")
-            self.suffix_frame.config(text="Suffix")
+        # CSV Mode: Prefix/Suffix を無効化（グレーアウト） / GUI Mode: 有効化
+        text_config = self.CSV_MODE_TEXT_CONFIG if is_csv_mode else self.GUI_MODE_TEXT_CONFIG
+        label_suffix = " (disabled in CSV Mode)" if is_csv_mode else ""
+        self.prefix_text.config(**text_config)
+        self.suffix_text.config(**text_config)
+        self.prefix_frame.config(text="Prefix" + label_suffix)
+        self.suffix_frame.config(text="Suffix" + label_suffix)
     
     def get_settings(self) -> dict:
         """Get current settings"""
-        # Get prefix/suffix from Text widgets (strip trailing newlines)
-        prefix_text = self.prefix_text.get("1.0", tk.END).rstrip('\n')
-        suffix_text = self.suffix_text.get("1.0", tk.END).rstrip('\n')
+        # Get prefix/suffix from Text widgets ("end-1c" leaves out the newline Tk always appends)
+        prefix_text = self.prefix_text.get("1.0", "end-1c")
+        suffix_text = self.suffix_text.get("1.0", "end-1c")
 
         # 操作速度をSHORT_SLEEP, LONG_SLEEPの値に変換
-        speed_map = {
-            '高速': {'short': 0.2, 'long': 0.5},
-            '中速': {'short': 0.3, 'long': 1.0},
-            '低速': {'short': 0.5, 'long': 1.5}
-        }
-        speed_config = speed_map.get(self.speed_var.get(), speed_map['中速'])
+        short_sleep, long_sleep = self.SPEED_MAP.get(self.speed_var.get(), self.SPEED_MAP['中速'])
+
+        # Numeric fields are IntVars (None when the field is empty or not a number)
+        wait = self._get_int(self.wait_var)
+        max_items = self._get_int(self.max_items_var)
+        retry = self._get_int(self.retry_var)
 
         settings = {
             'csv': self.csv_var.get(),
-            'wait': int(self.wait_var.get()) if self.wait_var.get().isdigit() else 60,
+            'wait': wait if wait is not None else 60,
             'dry_run': self.dry_run_var.get(),
             'interactive': self.interactive_var.get(),
             'prefix': prefix_text,
             'suffix': suffix_text,
-            'short_sleep': speed_config['short'],
-            'long_sleep': speed_config['long'],
+            'short_sleep': short_sleep,
+            'long_sleep': long_sleep,
             'use_csv_mode': self.mode_var.get() == 'csv'  # CSV/GUI モード切り替え
         }
 
-        if self.max_items_var.get().isdigit():
-            settings['max_items'] = int(self.max_items_var.get())
+        if max_items is not None:
+            settings['max_items'] = max_items
 
-        if self.retry_var.get().isdigit():
-            settings['retry'] = int(self.retry_var.get())
+        if retry is not None:
+            settings['retry'] = retry
 
         return settings
     
+    @staticmethod
+    def _get_int(var: tk.IntVar) -> Optional[int]:
+        """Return a non-negative IntVar value, or None if the Spinbox text is empty/invalid"""
+        try:
+            value = var.get()
+        except tk.TclError:
+            return None
+        return value if value >= 0 else None
+    
     def validate_settings(self) -> bool:
         """Validate settings"""
         csv_file = self.csv_var.get()
@@ -259,11 +330,11 @@ class ChatGPTGUIWindow:
             messagebox.showerror("Error", "Please select a CSV file")
             return False
         
-        if not Path(csv_file).exists():
+        if not os.path.isfile(csv_file):
             messagebox.showerror("Error", f"CSV file not found: {csv_file}")
             return False
         
-        if not self.wait_var.get().isdigit():
+        if self._get_int(self.wait_var) is None:
             messagebox.showerror("Error", "Wait time must be a number")
             return False
         
@@ -277,7 +348,7 @@ class ChatGPTGUIWindow:
         self.is_running = True
         self.start_btn.configure(state="disabled")
         self.stop_btn.configure(state="normal")
-        self.status_var.set("Starting...")
+        self._set_status("Starting...")
 
         if self.on_start_callback:
             self.on_start_callback(self.get_settings())
@@ -287,7 +358,7 @@ class ChatGPTGUIWindow:
         self.is_running = False
         self.start_btn.configure(state="normal")
         self.stop_btn.configure(state="disabled")
-        self.status_var.set("Stopping...")
+        self._set_status("Stopping...")
 
         if self.on_stop_callback:
             self.on_stop_callback()
@@ -297,30 +368,102 @@ class ChatGPTGUIWindow:
         self.on_start_callback = on_start
         self.on_stop_callback = on_stop
     
+    def _set_status(self, status: str):
+        """Set status bar text (skips the Tk update when unchanged)"""
+        if status != self._status_text:
+            self._status_text = status
+            self.status_var.set(status)
+    
     def update_progress(self, current: int, total: int):
-        """Update progress bar"""
+        """Update progress bar (at most every PROGRESS_MIN_INTERVAL seconds, the final update always goes through)"""
+        now = time.monotonic()
+        if now - self._last_progress_t < self.PROGRESS_MIN_INTERVAL and current != total:
+            return
+        self._last_progress_t = now
+        
         if total > 0:
             progress = (current / total) * 100
-            self.progress_var.set(progress)
-            self.status_var.set(f"Processing {current}/{total} ({progress:.1f}%)")
+            if progress != self._progress_value:
+                self._progress_value = progress
+                self.progress_var.set(progress)
+            self._set_status(f"Processing {current}/{total} ({progress:.1f}%)")
     
     def update_status(self, status: str):
         """Update status"""
-        self.status_var.set(status)
+        self._set_status(status)
+    
+    def _timestamp(self) -> str:
+        """Return the current "%H:%M:%S" log timestamp (formatted once per second)"""
+        sec = int(time.time())
+        if sec != self._last_sec:
+            self._last_ts = time.strftime("%H:%M:%S", time.localtime(sec))
+            self._last_sec = sec
+        return self._last_ts
     
     def add_log(self, message: str, tag: str = "info"):
-        """Add log message"""
-        import datetime
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-        log_line = f"{timestamp} - {message}\n"
+        """Add log message (buffered and written to the widget by _flush_log)"""
+        self._log_buffer.append((self._timestamp(), message, tag))
+    
+    def update_status_and_log(self, status: str, entries: Iterable[Tuple[str, str]]):
+        """Update status and add several log messages"""
+        timestamp = self._timestamp()
         
-        self.log_text.insert(tk.END, log_line, tag)
-        self.log_text.see(tk.END)
-        self.root.update_idletasks()
+        self._set_status(status)
+        for message, tag in entries:
+            self._log_buffer.append((timestamp, message, tag))
+    
+    def _flush_log(self):
+        """Write buffered log lines with a single Listbox.insert call, then color the non-info items"""
+        # Reschedule first so the pump keeps running even if this flush fails
+        self.root.after(self.LOG_FLUSH_MS, self._flush_log)
+        
+        buffer = self._log_buffer
+        if not buffer:
+            return
+        
+        self._ensure_log_widgets()
+        
+        # At most LOG_MAX_LINES per tick so a large backlog can't stall the Tk thread (the rest goes next tick)
+        parts = []
+        colored = []  # (offset in items, foreground)
+        tag_colors = self.LOG_TAG_COLORS
+        line_no = 0
+        for _ in range(min(len(buffer), self.LOG_MAX_LINES)):
+            timestamp, message, tag = buffer.popleft()
+            parts += (timestamp, " - ", message, "\n")
+            line_count = message.count("\n") + 1
+            color = tag_colors.get(tag)
+            if color:
+                colored.extend((line_no + i, color) for i in range(line_count))
+            line_no += line_count
+        
+        # "timestamp - message" lines are built by one join; multi-line messages become one item per line
+        items = "".join(parts).split("\n")
+        items.pop()  # empty string after the final newline
+        
+        listbox = self.log_listbox
+        start = listbox.size()
+        
+        # Only follow new lines if the view is already at the bottom (the user may have scrolled up)
+        follow = listbox.yview()[1] >= 1.0
+        
+        # Listbox.insert(index, item, item, ...) - one Tcl call for the whole batch
+        listbox.insert(tk.END, *items)
+        for offset, color in colored:
+            listbox.itemconfigure(start + offset, foreground=color)
+        
+        # Keep the widget bounded (older lines are dropped)
+        excess = start + len(items) - self.LOG_MAX_LINES
+        if excess > 0:
+            listbox.delete(0, excess - 1)
+        
+        if follow:
+            listbox.yview_moveto(1.0)
     
     def clear_log(self):
         """Clear log"""
-        self.log_text.delete(1.0, tk.END)
+        if self._log_built:
+            self.log_listbox.delete(0, tk.END)
     
     def on_process_finished(self, exit_code: int, total: int, sent: int, failed: int):
         """Process finished handler"""
@@ -335,7 +478,7 @@ class ChatGPTGUIWindow:
             status = f"Error: Process exited with code {exit_code}"
             tag = "error"
         
-        self.status_var.set(status)
+        self._set_status(status)
         self.add_log(status, tag)
     
     def run(self):
@@ -11,13 +11,56 @@ import json
 import sys
 import os
 from typing import Optional, Callable, Dict, Any
-import queue
+import collections
 from pathlib import Path
 
+try:
+    import orjson  # Optional: faster NDJSON parsing
+except ImportError:
+    orjson = None
+
+
+def _std_loads(line: bytes):
+    """Parse a UTF-8 line with json (invalid bytes are replaced, as the old text-mode pipe did)"""
+    return json.loads(line.decode('utf-8', 'replace'))
+
+
+if orjson is not None:
+    def _loads(line: bytes):
+        """Parse with orjson (falls back to json for input orjson rejects, e.g. lone surrogate escapes)"""
+        try:
+            return orjson.loads(line)
+        except orjson.JSONDecodeError:
+            return _std_loads(line)
+else:
+    _loads = _std_loads
+
+
+# Optional CLI arguments: (flag, settings key, value converter)
+# Added when the setting is truthy; a converter of None means a flag without a value
+_ARG_SPEC = (
+    ("--wait", "wait", str),
+    ("--dry-run", "dry_run", None),
+    ("--interactive", "interactive", None),
+    ("--max-items", "max_items", str),
+    ("--retry", "retry", str),
+    # Prefix/Suffix arguments
+    ("--prefix", "prefix", str),
+    ("--suffix", "suffix", str),
+    # 操作速度設定
+    ("--short-sleep", "short_sleep", str),
+    ("--long-sleep", "long_sleep", str),
+    # CSV/GUIモード切り替え
+    ("--csv-mode", "use_csv_mode", None)
+)
+
 
 class ProcessMonitor:
     """Subprocess CLI monitor class"""
     
+    # stdout is read in chunks of up to this many bytes and split into lines in Python
+    READ_CHUNK_SIZE = 65536
+    
     def __init__(self, working_dir: str = None):
         self.working_dir = working_dir or os.getcwd()
         self.process: Optional[subprocess.Popen] = None
@@ -25,8 +68,17 @@ class ProcessMonitor:
         self.is_running = False
         self.stop_requested = False
         
-        # Event queue for thread communication
-        self.event_queue = queue.Queue()
+        # Command prefix and child environment, built once (Popen only reads env)
+        self._cmd_head = (sys.executable, "-m", "chatgpt_prefix.chatgpt_cli")
+        self._base_env = dict(
+            os.environ,
+            PYTHONUNBUFFERED='1',  # Force Python to be unbuffered
+            PYTHONIOENCODING='utf-8'  # CLI output is UTF-8 (not the console code page)
+        )
+        
+        # Events from the reader threads, delivered to the callbacks by drain_events
+        # (deque append/popleft are atomic, so no lock is needed; (exit_code, result) tuples mark the end of a run)
+        self.event_ring = collections.deque()
         
         # Settings for event processing
         self.current_settings: Dict[str, Any] = {}
@@ -36,10 +88,21 @@ class ProcessMonitor:
         self.on_finished_callback: Optional[Callable[[int, Dict[str, int]], None]] = None
         
     def set_callbacks(self, on_event: Callable, on_finished: Callable):
-        """Set callback functions"""
+        """Set callback functions (invoked from drain_events, i.e. on the GUI thread)"""
         self.on_event_callback = on_event
         self.on_finished_callback = on_finished
     
+    def drain_events(self, max_events: int = 128):
+        """Deliver queued events to the callbacks - call periodically from the GUI thread"""
+        ring = self.event_ring
+        for _ in range(min(len(ring), max_events)):
+            item = ring.popleft()
+            if isinstance(item, tuple):
+                if self.on_finished_callback:
+                    self.on_finished_callback(*item)
+            elif self.on_event_callback:
+                self.on_event_callback(item)
+    
     def start_process(self, settings: Dict[str, Any]) -> bool:
         """Start CLI process"""
         if self.is_running:
@@ -53,26 +116,19 @@ class ProcessMonitor:
             cmd = self._build_command(settings)
             
             # Debug: Log the command being executed
-            if self.on_event_callback:
-                self.on_event_callback({
-                    "type": "raw_output",
-                    "message": f"Executing command: {' '.join(cmd)}",
-                    "level": "debug"
-                })
-            
-            # Start subprocess with unbuffered output
-            env = os.environ.copy()
-            env['PYTHONUNBUFFERED'] = '1'  # Force Python to be unbuffered
+            self.event_ring.append({
+                "type": "raw_output",
+                "message": f"Executing command: {' '.join(cmd)}",
+                "level": "debug"
+            })
             
+            # Start subprocess (the child flushes every line, so buffered reads here stay real-time)
             self.process = subprocess.Popen(
                 cmd,
                 cwd=self.working_dir,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=0,  # Unbuffered
-                universal_newlines=True,
-                env=env
+                stderr=subprocess.PIPE,  # Binary pipes: lines are split and decoded in _monitor_process
+                env=self._base_env
             )
             
             self.is_running = True
@@ -85,12 +141,11 @@ class ProcessMonitor:
             return True
             
         except Exception as e:
-            if self.on_event_callback:
-                self.on_event_callback({
-                    "type": "error",
-                    "error": f"Failed to start process: {e}",
-                    "step": "process_start"
-                })
+            self.event_ring.append({
+                "type": "error",
+                "error": f"Failed to start process: {e}",
+                "step": "process_start"
+            })
             return False
     
     def stop_process(self):
@@ -113,145 +168,131 @@ class ProcessMonitor:
                     self.process.kill()
                     
             except Exception as e:
-                if self.on_event_callback:
-                    self.on_event_callback({
-                        "type": "error",
-                        "error": f"Failed to stop process: {e}",
-                        "step": "process_stop"
-                    })
+                self.event_ring.append({
+                    "type": "error",
+                    "error": f"Failed to stop process: {e}",
+                    "step": "process_stop"
+                })
     
     def _build_command(self, settings: Dict[str, Any]) -> list:
         """Build CLI execution command"""
-        cmd = [sys.executable, "-m", "chatgpt_prefix.chatgpt_cli"]
+        cmd = list(self._cmd_head)
 
         # Required arguments
         cmd.extend(["--csv", settings['csv']])
         cmd.extend(["--ndjson"])  # NDJSON output mode
 
         # Optional arguments
-        if settings.get('wait'):
-            cmd.extend(["--wait", str(settings['wait'])])
-
-        if settings.get('dry_run'):
-            cmd.append("--dry-run")
-
-        if settings.get('interactive'):
-            cmd.append("--interactive")
-
-        if settings.get('max_items'):
-            cmd.extend(["--max-items", str(settings['max_items'])])
-
-        if settings.get('retry'):
-            cmd.extend(["--retry", str(settings['retry'])])
-
-        # Prefix/Suffix arguments
-        if settings.get('prefix'):
-            cmd.extend(["--prefix", settings['prefix']])
-
-        if settings.get('suffix'):
-            cmd.extend(["--suffix", settings['suffix']])
-
-        # 操作速度設定
-        if settings.get('short_sleep'):
-            cmd.extend(["--short-sleep", str(settings['short_sleep'])])
-
-        if settings.get('long_sleep'):
-            cmd.extend(["--long-sleep", str(settings['long_sleep'])])
-
-        # CSV/GUIモード切り替え
-        if settings.get('use_csv_mode'):
-            cmd.append("--csv-mode")
+        for flag, key, convert in _ARG_SPEC:
+            value = settings.get(key)
+            if value:
+                if convert is None:
+                    cmd.append(flag)
+                else:
+                    cmd.extend((flag, convert(value)))
 
         return cmd
     
-    def _process_line(self, line: str, final_result: dict):
+    def _process_line(self, line: bytes, final_result: dict):
         """Process a single NDJSON line"""
-        try:
-            # Parse NDJSON
-            event = json.loads(line)
-            
-            # Save final result
-            if event.get("type") == "result":
-                final_result.update({
-                    "total": event.get("total", 0),
-                    "sent": event.get("sent", 0),
-                    "failed": event.get("failed", 0)
-                })
-            
-            # Add settings context to event
-            event['_settings'] = self.current_settings
-            
-            # Event callback - call immediately for real-time processing
-            if self.on_event_callback:
-                self.on_event_callback(event)
-                
-        except json.JSONDecodeError as e:
+        # NDJSON events always start with "{" - other lines are not parsed at all
+        # (avoids building a JSONDecodeError for every traceback/print line)
+        event = None
+        if line.startswith(b"{"):
+            try:
+                # Parse NDJSON
+                event = _loads(line)
+            except ValueError:  # JSONDecodeError (either backend)
+                pass  # Malformed "{..." line - shown as plain output below
+        
+        if event is None:
             # Non-JSON output (error messages etc.)
-            if self.on_event_callback:
-                self.on_event_callback({
-                    "type": "raw_output",
-                    "message": line,
-                    "level": "info"
-                })
+            self.event_ring.append({
+                "type": "raw_output",
+                "message": line.decode('utf-8', 'replace'),
+                "level": "info"
+            })
+            return
+        
+        # Save final result
+        if event.get("type") == "result":
+            final_result.update({
+                "total": event.get("total", 0),
+                "sent": event.get("sent", 0),
+                "failed": event.get("failed", 0)
+            })
+        
+        # Add settings context to event
+        event['_settings'] = self.current_settings
+        
+        # Queue for the GUI thread (drain_events)
+        self.event_ring.append(event)
     
     def _monitor_process(self):
         """Process monitor thread"""
         final_result = {"total": 0, "sent": 0, "failed": 0}
+        process = self.process
+        
+        # Drain stderr on its own thread so a chatty child can't block on a full stderr pipe
+        stderr_thread = threading.Thread(target=self._drain_stderr, args=(process.stderr,), daemon=True)
+        stderr_thread.start()
         
         try:
-            # Read stdout in real-time with immediate processing
-            while self.process and self.process.poll() is None:
-                if self.stop_requested:
+            # Blocking reads: the thread sleeps until the CLI writes something, and the loop
+            # ends at EOF (process exit, or stop_process terminating it).
+            # selectors can't wait on pipes on Windows, so there is no select/poll loop.
+            # read1 returns whatever is available (up to READ_CHUNK_SIZE); complete lines are
+            # split off here and the unfinished tail is kept for the next chunk.
+            read = process.stdout.read1
+            tail = b""
+            while not self.stop_requested:
+                chunk = read(self.READ_CHUNK_SIZE)
+                if not chunk:
                     break
                 
-                # Simple approach: always try to read with immediate processing
-                import time
-                
-                try:
-                    line = self.process.stdout.readline()
+                lines = (tail + chunk).split(b"\n")
+                tail = lines.pop()
+                for line in lines:
+                    line = line.strip()  # also drops the "\r" of Windows line endings
                     if line:
-                        line = line.strip()
-                        if line:
-                            self._process_line(line, final_result)
-                    else:
-                        # Small delay if no data to avoid busy waiting
-                        time.sleep(0.01)
-                except Exception as e:
-                    # Handle any read errors gracefully
-                    time.sleep(0.01)
+                        self._process_line(line, final_result)
             
-            # Wait for process to finish
-            if self.process:
-                exit_code = self.process.wait()
-            else:
-                exit_code = -1
+            # Last line without a trailing newline
+            line = tail.strip()
+            if line and not self.stop_requested:
+                self._process_line(line, final_result)
             
-            # Read stderr if available
-            if self.process and self.process.stderr:
-                stderr_output = self.process.stderr.read()
-                if stderr_output:
-                    if self.on_event_callback:
-                        self.on_event_callback({
-                            "type": "error",
-                            "error": stderr_output,
-                            "step": "stderr"
-                        })
+            # Wait for process to finish (and for the remaining stderr lines, so they come before on_finished)
+            exit_code = process.wait()
+            stderr_thread.join()
             
         except Exception as e:
             exit_code = -1
-            if self.on_event_callback:
-                self.on_event_callback({
-                    "type": "error",
-                    "error": f"Monitor thread error: {e}",
-                    "step": "monitor"
-                })
+            self.event_ring.append({
+                "type": "error",
+                "error": f"Monitor thread error: {e}",
+                "step": "monitor"
+            })
         
         finally:
             self.is_running = False
             
-            # Finished callback
-            if self.on_finished_callback:
-                self.on_finished_callback(exit_code, final_result)
+            # Finished callback (queued behind the remaining events)
+            self.event_ring.append((exit_code, final_result))
+    
+    def _drain_stderr(self, stderr):
+        """stderr reader thread - forward each line as an error event while the process runs"""
+        try:
+            for line in stderr:
+                line = line.decode('utf-8', 'replace').rstrip()
+                if line:
+                    self.event_ring.append({
+                        "type": "error",
+                        "error": line,
+                        "step": "stderr"
+                    })
+        except (OSError, ValueError):
+            pass  # Pipe closed during cleanup
     
     def is_process_running(self) -> bool:
         """Check if process is running"""
@@ -22,6 +22,10 @@ from .gui.event_handler import EventHandler
 class SoraGUIApplication:
     """Main GUI Application"""
     
+    # Process monitor events are delivered on the Tk thread every EVENT_DRAIN_MS (ms), at most EVENT_DRAIN_MAX per tick
+    EVENT_DRAIN_MS = 16
+    EVENT_DRAIN_MAX = 128
+    
     def __init__(self):
         self.root = tk.Tk()
         
@@ -34,6 +38,9 @@ class SoraGUIApplication:
         self.setup_callbacks()
         self.setup_cleanup()
         self.set_defaults()
+        
+        # Start delivering process monitor events
+        self.root.after(self.EVENT_DRAIN_MS, self._drain_events)
     
     def setup_callbacks(self):
         """Setup callback functions"""
@@ -47,6 +54,11 @@ class SoraGUIApplication:
             on_finished=self.on_finished
         )
     
+    def _drain_events(self):
+        """Deliver queued process monitor events on the Tk thread"""
+        self.root.after(self.EVENT_DRAIN_MS, self._drain_events)
+        self.process_monitor.drain_events(self.EVENT_DRAIN_MAX)
+    
     def setup_cleanup(self):
         """Setup cleanup handlers"""
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)